@@ -1,8 +1,29 @@
+import os
+import uuid
+
 import streamlit as st
 import pandas as pd
 import numpy as np
 
+from seasonfinder import data
+from seasonfinder.daily import month_codes, month_season_days
+from seasonfinder.instrument import Recorder
+from seasonfinder.pipeline import app_pipeline
+from seasonfinder.regions import winning_regions
+from seasonfinder.seasons import EPISODES, LONGEST_RUN, SEASON_LABELS, season_codes
+
+TIMINGS_LOG = os.environ.get("SEASONFINDER_TIMINGS_LOG", "seasonfinder_timings.jsonl")
+
 st.title("SeasonFinder (Prototype v1)")
+
+# Opt-in stage timings: sidebar panel + JSON lines in TIMINGS_LOG
+instrument = st.sidebar.checkbox(
+    "Debug: stage timings", value=os.environ.get("SEASONFINDER_INSTRUMENT") == "1"
+)
+if "session_id" not in st.session_state:
+    st.session_state["session_id"] = uuid.uuid4().hex[:12]
+rec = Recorder(enabled=instrument, log_path=TIMINGS_LOG, session=st.session_state["session_id"])
+
 unit = st.radio("Temperature unit", ["°F", "°C"], horizontal=True)
 
 def c_to_f(c): 
@@ -11,19 +32,19 @@ def c_to_f(c):
 def f_to_c(f): 
     return (f - 32) * 5/9
 
-def season_label_for_month(temp_c, winter_c, summer_c):
-    if temp_c <= winter_c:
-        return "Winter"
-    if temp_c >= summer_c:
-        return "Summer"
-    return "Transition"
+def fmt_bytes(n):
+    for unit_name in ["B", "KiB", "MiB"]:
+        if n < 1024:
+            return f"{n:.0f} {unit_name}" if unit_name == "B" else f"{n:.1f} {unit_name}"
+        n /= 1024
+    return f"{n:.1f} GiB"
 
 SEASON_COLORS = {
     "Winter": "#2b6cb0",      # blue
     "Spring": "#2f855a",      # green
     "Summer": "#c05621",      # orange
     "Autumn": "#b7791f",      # amber
-    "Transition": "#4a5568"   # gray (should rarely show after we split)
+    "Transition": "#4a5568"   # gray (only for months with missing temps)
 }
 
 def color_season_cell(val):
@@ -32,24 +53,47 @@ def color_season_cell(val):
     return f"background-color: {color}; color: white; font-weight: 600;"
 
 
-st.write("Upload a CSV of cities with monthly average temps (T1..T12).")
+st.write(
+    "Upload a CSV of cities with monthly average temps (T1..T12), daily temps (D1..D365), "
+    "or one row per day (City, Country, Date, Temp)."
+)
 
 uploaded = st.file_uploader("Upload your own CSV (optional)", type=["csv"])
 
+# Parsed once per file contents and shared by every session (read-only!)
+rec.begin("parse")
 if uploaded is not None:
-    df = pd.read_csv(uploaded)
+    ds = data.load_dataset(uploaded)
     st.success("Using uploaded dataset.")
 else:
-    df = pd.read_csv("cities_sample.csv")
+    ds = data.load_dataset("cities_sample.csv", pinned=True)
     st.info("Using built-in city dataset.")
+df = ds.df
+rec.end()
 
+cache = data.cache_stats()
+st.sidebar.caption(
+    f"Dataset cache: {cache['hits']} hits / {cache['misses']} misses, "
+    f"{cache['entries']} cached ({fmt_bytes(cache['bytes'])} of {fmt_bytes(cache['max_bytes'])})"
+)
+if cache["over_budget"]:
+    st.sidebar.warning(
+        "The dataset is bigger than the cache budget, so it is the only one kept. "
+        "Raise SEASONFINDER_CACHE_MB to keep several."
+    )
 
-temp_cols = [f"T{i}" for i in range(1, 13)]
-missing = [c for c in temp_cols if c not in df.columns]
-if missing:
-    st.error(f"Missing columns in CSV: {missing}")
+
+if ds.missing:
+    st.error(f"Missing columns in CSV: {ds.missing}")
+    rec.flush()
     st.stop()
 
+# Daily data classifies each day; lengths come out as fractional months
+daily = False
+if ds.daily is not None:
+    daily = st.radio("Resolution", ["Daily", "Monthly"], horizontal=True) == "Daily"
+period = "daily" if daily else "monthly"
+
 st.subheader("Season rules (simple v1)")
 
 if unit == "°F":
@@ -61,6 +105,12 @@ else:
     winter_thresh = st.slider("Winter month if temp ≤ (°C)", -30.0, 20.0, 5.0, 0.5)
     summer_thresh = st.slider("Summer month if temp ≥ (°C)", 0.0, 40.0, 20.0, 0.5)
 
+# Overlapping thresholds would make a month both Winter and Summer
+if winter_thresh >= summer_thresh:
+    st.error("The winter threshold must be below the summer threshold.")
+    rec.flush()
+    st.stop()
+
 st.subheader("Your preferred season lengths (auto-fills the last one)")
 
 w_pref = st.slider("Winter months", 0, 12, 5)
@@ -74,124 +124,299 @@ su_pref = st.slider("Summer months", 0, max_summer, min(3, max_summer))
 fa_pref = 12 - (w_pref + sp_pref + su_pref)
 st.write(f"**Autumn months:** {fa_pref}")
 
-T = df[temp_cols].to_numpy()
+# One point off per extra spell of a season (e.g. a cold snap after spring began)
+contiguity = int(st.checkbox(
+    "Prefer unbroken seasons (−1 point each time a season comes back)",
+    disabled=daily,
+))
+
+# Only cities in the chosen area are classified and scored (datasets with
+# Lat/Lon columns; the spatial index is built once per dataset)
+region = None
+if ds.geo is not None:
+    st.subheader("Location (optional)")
+    where = st.radio("Search", ["Anywhere", "Near a city", "Near coordinates", "Inside a box"], horizontal=True)
+    if where == "Near a city":
+        col_city, col_country, col_km = st.columns(3)
+        near_city = col_city.text_input("City", "Denver")
+        near_country = col_country.text_input("Country", "USA")
+        radius_km = col_km.number_input("Within (km)", 10, 20000, 500, 50)
+        near_rows = [r for r in ds.rows_for(near_city, near_country) if np.isfinite(ds.geo.lat[r])]
+        if near_rows:
+            region = ("radius", float(ds.geo.lat[near_rows[0]]), float(ds.geo.lon[near_rows[0]]), float(radius_km))
+        else:
+            st.warning(f"No coordinates for {near_city}, {near_country} in this dataset; searching everywhere.")
+    elif where == "Near coordinates":
+        col_lat, col_lon, col_km = st.columns(3)
+        lat = col_lat.number_input("Latitude", -90.0, 90.0, 39.74)
+        lon = col_lon.number_input("Longitude", -180.0, 180.0, -104.99)
+        radius_km = col_km.number_input("Within (km)", 10, 20000, 500, 50)
+        region = ("radius", float(lat), float(lon), float(radius_km))
+    elif where == "Inside a box":
+        col_s, col_n, col_w, col_e = st.columns(4)
+        south = col_s.number_input("South", -90.0, 90.0, 25.0)
+        north = col_n.number_input("North", -90.0, 90.0, 50.0)
+        west = col_w.number_input("West", -180.0, 180.0, -125.0)
+        east = col_e.number_input("East", -180.0, 180.0, -65.0)
+        region = ("bbox", float(south), float(north), float(west), float(east))
+
+# Facet filters (Country and other low-cardinality columns, indexed at load):
+# each selection is a union of per-value row lists, intersected across facets.
+# Counts next to each value reflect the location and the other facets.
+facets = ()
+if ds.facets:
+    facet_cols = sorted(ds.facets, key=lambda c: c != "Country")
+    selected = {c: st.session_state.get(f"facet_{c}", []) for c in facet_cols}
+    with st.expander("Filter by " + ", ".join(facet_cols)):
+        for col in facet_cols:
+            index = ds.facets[col]
+            others = [(c, v) for c, v in selected.items() if c != col]
+            counts = dict(zip(index.uniques, index.value_counts(ds.filter_rows(region, others))))
+            st.multiselect(
+                col,
+                sorted(index.uniques, key=str),
+                key=f"facet_{col}",
+                format_func=lambda v, counts=counts: f"{v} ({counts[v]:,})",
+            )
+    facets = tuple((c, tuple(st.session_state[f"facet_{c}"])) for c in facet_cols)
+
+T = ds.T  # shared, read-only
 
 T_c = T  # assume the CSV temps are in °C for now
 
-# For display only
-if unit == "°F":
-    T_display = c_to_f(T_c)
-else:
-    T_display = T_c
-
-is_winter = T_c <= winter_thresh
-is_summer = T_c >= summer_thresh
-
-winter_len = is_winter.sum(axis=1)
-summer_len = is_summer.sum(axis=1)
-
-# Transition months are neither winter nor summer
-is_transition = (~is_winter) & (~is_summer)
-
-# month-to-month temperature change (wrap around Dec->Jan)
-delta = np.roll(T_c, -1, axis=1) - T_c  # next_month - this_month
-
-# Spring-like if warming, Autumn-like if cooling (only for transition months)
-is_spring = is_transition & (delta > 0)
-is_fall   = is_transition & (delta < 0)
-
-# If delta == 0, split them later (rare with real data, but possible)
-is_flat = is_transition & (delta == 0)
-
-spring_len = is_spring.sum(axis=1)
-fall_len = is_fall.sum(axis=1)
-
-# Split flat months evenly between spring/fall (keeps totals consistent)
-flat_len = is_flat.sum(axis=1)
-spring_len = spring_len + (flat_len // 2)
-fall_len = fall_len + (flat_len - (flat_len // 2))
-
-
-score = (
-    np.abs(winter_len - w_pref)
-    + np.abs(spring_len - sp_pref)
-    + np.abs(summer_len - su_pref)
-    + np.abs(fall_len - fa_pref)
+# Memoized stages: each rerun only recomputes what the changed widgets affect
+# (preferences don't reclassify, the °F/°C switch doesn't rescore).
+# Season lengths come from the dataset's sorted-month index. Rules: Winter if
+# <= winter_thresh, Summer if >= summer_thresh, in-between months are Spring
+# while warming and Autumn while cooling, with flat months split evenly.
+if "pipeline" not in st.session_state:
+    st.session_state["pipeline"] = app_pipeline()
+pipe = st.session_state["pipeline"]
+
+prefs = (w_pref, sp_pref, su_pref, fa_pref)
+
+# Threshold sweep grid around the current setting (in the display unit), only
+# while its checkbox (rendered further down) is ticked
+sweep_grid = None
+if st.session_state.get("sweep_on") and not daily and not contiguity:
+    if unit == "°F":
+        steps_w = winter_thresh_f + np.arange(-10, 11, 1.0)
+        steps_s = summer_thresh_f + np.arange(-10, 11, 1.0)
+        sweep_grid = (tuple(f_to_c(steps_w)), tuple(f_to_c(steps_s)))
+    else:
+        sweep_grid = (tuple(winter_thresh + np.arange(-5, 5.5, 0.5)), tuple(summer_thresh + np.arange(-5, 5.5, 0.5)))
+
+stages = pipe.run(
+    recorder=rec,
+    dataset=ds,
+    winter_c=winter_thresh,
+    summer_c=summer_thresh,
+    prefs=prefs,
+    k=20,
+    unit=unit,
+    daily=daily,
+    contiguity=contiguity,
+    sweep=sweep_grid,
+    region=region,
+    facets=facets,
+)
+st.sidebar.caption("Stages run: " + (", ".join(pipe.ran) or "none (all cached)"))
+lengths_cache = data.lengths_cache_stats()
+st.sidebar.caption(
+    f"Season-length cache: {lengths_cache['hit_rate']:.0%} hit rate "
+    f"({lengths_cache['hits']} hits / {lengths_cache['misses']} misses, "
+    f"{lengths_cache['entries']} pairs, {fmt_bytes(lengths_cache['bytes'])} of {fmt_bytes(lengths_cache['max_bytes'])})"
 )
 
-out = df.copy()
-out["Winter"] = winter_len
-out["Spring"] = spring_len
-out["Summer"] = summer_len
-out["Autumn"] = fall_len
-out["Score"] = score
+# Per-city results stay as arrays aligned with df rows (or with the location
+# filter's candidates); only the rows we show get materialized into a frame.
+results = stages["score"]
+score = results.dist  # distance per city, lower is better
+candidates = stages["candidates"]
+if candidates is not None:
+    st.caption(f"{len(candidates):,} of {len(df):,} cities match the filters.")
+    if not len(candidates):
+        st.warning("No cities match the filters.")
+        rec.flush()
+        st.stop()
 
 st.subheader("Top matches")
 
-max_score = 48  # 4 seasons × 12 months max difference
-
-# Start from the raw "distance" score (lower is better)
-out2 = out.copy()
+# Best-first rows, read bucket by bucket (ties keep dataset order)
+top_rows = stages["rank"]["top_rows"]
+top = stages["display"]["top"]
 
-# Convert to "higher is better"
-out2["Score"] = max_score - out2["Score"]
+# One O(N) counting pass: ranks, percentiles and the score distribution
+ranker = stages["rank"]["ranker"]
 
-# Sort best-first (highest score)
-out_sorted = out2.sort_values("Score", ascending=False).reset_index(drop=True)
-
-# Rank AFTER sorting
-out_sorted["Rank"] = np.arange(1, len(out_sorted) + 1)
-
-# Match %
-out_sorted["Match %"] = (out_sorted["Score"] / max_score * 100).clip(0, 100).round(1)
-
-top = out_sorted.head(20)
+mem = data.memory_report(
+    results=results,
+    buckets=stages["buckets"],
+    masks=stages["masks"],
+    ranking=stages["rank"],
+    display=stages["display"],
+    sweep=stages["sweep"],
+)
+with st.sidebar.expander("Memory"):
+    st.write(f"Shared caches: **{fmt_bytes(mem['shared'])}**")
+    st.caption(", ".join(f"{k} {fmt_bytes(v)}" for k, v in mem["shared_detail"].items()))
+    st.write(f"This session: **{fmt_bytes(mem['per_session'])}**")
+    st.caption(", ".join(f"{k} {fmt_bytes(v)}" for k, v in mem["per_session_detail"].items()))
 
+rec.begin("render_top")
 st.dataframe(
     top[["Rank", "City", "Country", "Score", "Match %", "Winter", "Spring", "Summer", "Autumn"]],
     hide_index=True,
     use_container_width=True
 )
 
-st.subheader("City details")
-
-# Use only the top results for the dropdown (keeps it clean)
-top_for_pick = out_sorted.head(20).copy()
+months = ["Jan","Feb","Mar","Apr","May","Jun","Jul","Aug","Sep","Oct","Nov","Dec"]
 
-# Make a nice label like: "1. Chicago, USA (91.7%)"
-top_for_pick["Label"] = (
-    top_for_pick["Rank"].astype(str) + ". "
-    + top_for_pick["City"].astype(str) + ", "
-    + top_for_pick["Country"].astype(str)
-    + " (" + top_for_pick["Match %"].astype(str) + "%)"
+# Season calendar for the shown rows, from the same vectorized labeler as the counts
+st.markdown("#### Season calendar")
+calendar_df = stages["display"]["calendar"]
+st.dataframe(calendar_df.style.applymap(color_season_cell), use_container_width=True)
+
+st.markdown("#### How all cities scored")
+hist = ranker.histogram()
+if daily:
+    # Day-resolution scores, binned by whole months
+    hist = np.bincount((np.arange(len(hist)) / results.per_month).astype(int), weights=hist).astype(int)
+st.bar_chart(pd.DataFrame({"Cities": hist}, index=pd.Index(np.arange(len(hist)), name="Score")))
+
+st.markdown("#### Threshold sensitivity")
+st.checkbox(
+    "Sweep thresholds around the current setting (±10°F / ±5°C)",
+    key="sweep_on",
+    disabled=daily or bool(contiguity),
+    help="Monthly data without the unbroken-seasons penalty only. Recomputes the ranking for every winter/summer pair on the grid in one pass.",
 )
+sweep = stages["sweep"]
+if sweep is not None:
+    leader = top.iloc[0]
+    fmt = (lambda c: f"{c_to_f(c):.0f}°F") if unit == "°F" else (lambda c: f"{c:.1f}°C")
+    view = st.radio("Show", [f"Rank of {leader['City']}", "Top city per cell"], horizontal=True)
+    # Cells with winter at or above summer aren't settings: left blank, in grey
+    valid = sweep.valid
+    if view == "Top city per cell":
+        cells = np.where(valid, np.asarray(df["City"].astype(str))[np.maximum(sweep.top_rows, 0)], "")
+    else:
+        cells = np.where(valid, sweep.focus_ranks, None)
+    grid_df = pd.DataFrame(
+        cells,
+        index=pd.Index([fmt(w) for w in sweep.winter], name="Winter ≤"),
+        columns=pd.Index([fmt(s_) for s_ in sweep.summer], name="Summer ≥"),
+    )
+    if view != "Top city per cell":
+        grid_df = grid_df.astype("Int64")  # whole ranks, blanks where not valid
+    centre = (len(sweep.winter) // 2, len(sweep.summer) // 2)
+
+    def sweep_colors(frame):
+        # Green where the current #1 still wins, amber if it stays on the podium
+        css = np.where(sweep.focus_ranks == 1, "background-color: #2f855a; color: white;",
+                       np.where(sweep.focus_ranks <= 3, "background-color: #b7791f; color: white;",
+                                "background-color: #4a5568; color: white;"))
+        css = np.where(valid, css, "background-color: #e2e8f0;").astype(object)
+        css[centre] += " outline: 2px solid black; font-weight: 700;"
+        return pd.DataFrame(css, index=frame.index, columns=frame.columns)
+
+    st.dataframe(grid_df.style.apply(sweep_colors, axis=None), use_container_width=True)
+    st.caption(
+        f"{leader['City']} stays #1 in {sweep.stability():.0%} of {int(valid.sum())} threshold pairs "
+        f"(outlined: current setting; grey: winter not below summer)."
+    )
+
+# Full ranks are only computed when someone asks for the export
+rec.end()
+if st.checkbox("Prepare full ranking for download"):
+    rec.begin("export")
+    ranks = ranker.ranks()
+    by_rank = np.empty_like(ranks)
+    by_rank[ranks - 1] = np.arange(len(ranks))
+    export = results.frame(df, by_rank, ranks=ranks[by_rank], columns=df.columns)
+    export_rows = results.row_ids(by_rank)
+    if daily:
+        # Gathered a chunk at a time, never the whole N×365 matrix
+        export_codes = month_codes(ds.daily, winter_thresh, summer_thresh, rows=export_rows)
+    else:
+        export_codes = season_codes(T_c[export_rows], winter_thresh, summer_thresh)
+    for j, month in enumerate(months):
+        export[f"{month} season"] = pd.Categorical.from_codes(export_codes[:, j], SEASON_LABELS)
+    st.download_button(
+        "Download ranking CSV",
+        export.to_csv(index=False),
+        file_name="seasonfinder_ranking.csv",
+        mime="text/csv",
+    )
 
-picked_label = st.selectbox("Select a city to inspect", top_for_pick["Label"].tolist())
+rec.begin("render_detail")
+st.subheader("City details")
+
+# The dropdown offers the top results, or the best name matches for a search
+# over every city that passes the filters (trigram index, so typos and missing
+# accents still find it). The options are row ids (positions in df), so the
+# lookup below is positional and cities that share a name can't be confused.
+top_index = {int(row): i for i, row in enumerate(top["Row"])}
+
+query = st.text_input("Search all cities", placeholder="e.g. zurich, sao paulo, Portland USA")
+choices = top
+if query and ds.search is not None:
+    hit_rows, hit_scores = ds.search.search(query, k=10, rows=candidates)
+    hit_rows = hit_rows[hit_scores >= 0.3]  # drop matches on a stray trigram or two
+    if len(hit_rows):
+        hit_at = [results.position(r) for r in hit_rows]
+        choices = results.frame(df, hit_at, ranks=[ranker.rank_of(a) for a in hit_at])
+    else:
+        st.caption(f"No city matches “{query}”{' within the filters' if candidates is not None else ''}.")
+choice_index = {int(row): i for i, row in enumerate(choices["Row"])}
+
+def pick_label(row):
+    # Make a nice label like: "1. Chicago, USA (91.7%)"
+    r = choices.iloc[choice_index[row]]
+    return f"{r['Rank']}. {r['City']}, {r['Country']} ({r['Match %']}%)"
+
+picked_pos = st.selectbox(
+    "Select a city to inspect" if choices is top else "Matching cities",
+    list(choice_index),
+    format_func=pick_label,
+)
+picked_row = choices.iloc[choice_index[picked_pos]]
 
-picked_row = top_for_pick[top_for_pick["Label"] == picked_label].iloc[0]
-picked_city = picked_row["City"]
+# Exact rank and percentile straight from the score counts, no full sort needed
+# (the ranker counts result positions, which differ from rows under a filter)
+picked_at = results.position(picked_pos)
+picked_rank = ranker.rank_of(picked_at)
+picked_pct = ranker.percentile(picked_at)
 
 st.write(
-    f"**Selected:** {picked_row['Rank']}. {picked_row['City']}, {picked_row['Country']} — "
+    f"**Selected:** {picked_rank}. {picked_row['City']}, {picked_row['Country']} — "
     f"**Match:** {picked_row['Match %']}%  |  "
+    f"**Percentile:** {picked_pct:.0f}  |  "
     f"Winter {picked_row['Winter']} • Spring {picked_row['Spring']} • "
     f"Summer {picked_row['Summer']} • Autumn {picked_row['Autumn']}"
 )
 
-# Grab that city's temps from the original dataframe
-city_row = df[df["City"] == picked_city].iloc[0]
-temps_c = city_row[temp_cols].to_numpy(dtype=float)
+namesakes = ds.rows_for(picked_row["City"], picked_row.get("Country"))
+if len(namesakes) > 1:
+    st.caption(f"{len(namesakes)} rows in this dataset are named {picked_row['City']}, {picked_row['Country']}; showing row {picked_pos}.")
 
-# Convert for display
-if unit == "°F":
-    temps_display = c_to_f(temps_c)
-else:
-    temps_display = temps_c
+# That city's temps, by row id (no name lookup)
+temps_c = T_c[picked_pos]
 
-months = ["Jan","Feb","Mar","Apr","May","Jun","Jul","Aug","Sep","Oct","Nov","Dec"]
+# Already converted for display by the (unit-keyed) display stage for the top
+# rows; a searched-for city is converted here. Daily mode has 365 of them
+if picked_pos in top_index:
+    temps_display = stages["display"]["temps"][top_index[picked_pos]]
+else:
+    temps_display = ds.daily[picked_pos] if daily else temps_c
+    temps_display = c_to_f(temps_display) if unit == "°F" else temps_display
 
-chart_df = pd.DataFrame({"Month": months, f"Temp ({unit})": temps_display})
-chart_df = chart_df.set_index("Month")
+if daily:
+    chart_df = pd.DataFrame({"Day": np.arange(1, 366), f"Temp ({unit})": temps_display})
+    chart_df = chart_df.set_index("Day")
+else:
+    chart_df = pd.DataFrame({"Month": months, f"Temp ({unit})": temps_display})
+    chart_df = chart_df.set_index("Month")
 
 st.line_chart(chart_df)
 
@@ -199,38 +424,37 @@ st.markdown("### What your settings mean (plain English)")
 
 if unit == "°F":
     st.write(
-        f"- A month counts as **Winter** if the city's monthly average is **≤ {winter_thresh_f:.0f}°F**\n"
-        f"- A month counts as **Summer** if the city's monthly average is **≥ {summer_thresh_f:.0f}°F**\n"
+        f"- A {'day' if daily else 'month'} counts as **Winter** if the city's {period} average is **≤ {winter_thresh_f:.0f}°F**\n"
+        f"- A {'day' if daily else 'month'} counts as **Summer** if the city's {period} average is **≥ {summer_thresh_f:.0f}°F**\n"
         f"- Anything in between is a **transition month** (Spring or Autumn depending on warming/cooling)"
     )
 else:
     st.write(
-        f"- A month counts as **Winter** if the city's monthly average is **≤ {winter_thresh:.1f}°C**\n"
-        f"- A month counts as **Summer** if the city's monthly average is **≥ {summer_thresh:.1f}°C**\n"
+        f"- A {'day' if daily else 'month'} counts as **Winter** if the city's {period} average is **≤ {winter_thresh:.1f}°C**\n"
+        f"- A {'day' if daily else 'month'} counts as **Summer** if the city's {period} average is **≥ {summer_thresh:.1f}°C**\n"
         f"- Anything in between is a **transition month** (Spring or Autumn depending on warming/cooling)"
     )
 
 st.markdown("### Month-by-month breakdown")
 
-# classify each month for THIS city
-labels = [season_label_for_month(t, winter_thresh, summer_thresh) for t in temps_c]
-
-# turn Transition into Spring/Autumn based on warming/cooling (same logic as earlier)
-deltas = np.roll(temps_c, -1) - temps_c  # next - current (wraps)
-for i in range(12):
-    if labels[i] == "Transition":
-        if deltas[i] > 0:
-            labels[i] = "Spring"
-        elif deltas[i] < 0:
-            labels[i] = "Autumn"
-        else:
-            labels[i] = "Spring"  # tie-breaker
+# classify each month for THIS city (same rules, and flat-month split, as the counts)
+if daily:
+    # Monthly means for the table; each month is labelled by most of its days
+    days = month_season_days(ds.daily[picked_pos][None, :], winter_thresh, summer_thresh)[0]
+    labels = SEASON_LABELS[month_codes(ds.daily[picked_pos][None, :], winter_thresh, summer_thresh)[0]]
+    month_temps = c_to_f(temps_c) if unit == "°F" else temps_c
+else:
+    labels = SEASON_LABELS[season_codes(temps_c[None, :], winter_thresh, summer_thresh)[0]]
+    month_temps = temps_display
 
 detail_df = pd.DataFrame({
     "Month": months,
-    f"Temp ({unit})": np.round(temps_display, 1),
+    f"Temp ({unit})": np.round(month_temps, 1),
     "Season": labels
 })
+if daily:
+    for j, name in enumerate(["Winter", "Spring", "Summer", "Autumn"]):
+        detail_df[f"{name} days"] = days[:, j]
 
 # Make Month the index so it displays nicely
 detail_df2 = detail_df.set_index("Month")
@@ -248,16 +472,74 @@ st.write(
     f"Your preference: Winter **{w_pref}**, Spring **{sp_pref}**, Summer **{su_pref}**, Autumn **{fa_pref}** months."
 )
 st.write(
-    f"This city: Winter **{int(picked_row['Winter'])}**, Spring **{int(picked_row['Spring'])}**, "
-    f"Summer **{int(picked_row['Summer'])}**, Autumn **{int(picked_row['Autumn'])}** months."
+    f"This city: Winter **{picked_row['Winter']:g}**, Spring **{picked_row['Spring']:g}**, "
+    f"Summer **{picked_row['Summer']:g}**, Autumn **{picked_row['Autumn']:g}** months."
 )
 
-diff_w = int(picked_row["Winter"]) - w_pref
-diff_sp = int(picked_row["Spring"]) - sp_pref
-diff_su = int(picked_row["Summer"]) - su_pref
-diff_fa = int(picked_row["Autumn"]) - fa_pref
+# Fractional in daily mode, so round before formatting
+diff_w = round(float(picked_row["Winter"]) - w_pref, 1)
+diff_sp = round(float(picked_row["Spring"]) - sp_pref, 1)
+diff_su = round(float(picked_row["Summer"]) - su_pref, 1)
+diff_fa = round(float(picked_row["Autumn"]) - fa_pref, 1)
 
 st.write(
-    f"Difference: Winter {diff_w:+d}, Spring {diff_sp:+d}, Summer {diff_su:+d}, Autumn {diff_fa:+d}."
+    f"Difference: Winter {diff_w:+g}, Spring {diff_sp:+g}, Summer {diff_su:+g}, Autumn {diff_fa:+g}."
 )
 
+if stages["masks"] is not None:
+    spells = [int(EPISODES[m[picked_at]]) for m in stages["masks"]]
+    longest = [int(LONGEST_RUN[m[picked_at]]) for m in stages["masks"]]
+    broken = [
+        f"{name} {n} spells (longest {run} month{'s' if run > 1 else ''})"
+        for name, n, run in zip(["Winter", "Spring", "Summer", "Autumn"], spells, longest)
+        if n > 1
+    ]
+    st.write(
+        f"Broken seasons: {', '.join(broken)} (−{sum(n - 1 for n in spells if n > 1)} points)."
+        if broken else "Every season comes in one unbroken stretch."
+    )
+
+st.markdown("### Where would this city be #1?")
+
+if daily:
+    st.caption("Available for monthly data.")
+else:
+    # Exact answer over the breakpoint cells (no slider scanning); kept until
+    # the city, preferences, filters or unit (the search bounds) change.
+    # Plain distance only, so not with the unbroken-seasons penalty
+    regions_key = (ds.key, int(picked_pos), prefs, region, facets, unit, contiguity)
+    if contiguity:
+        st.caption("Untick “Prefer unbroken seasons” to use this; it ranks without the penalty.")
+    if st.button(f"Find the thresholds where {picked_row['City']} ranks #1", disabled=bool(contiguity)):
+        if unit == "°F":
+            bounds = ((f_to_c(-20.0), f_to_c(70.0)), (f_to_c(40.0), f_to_c(110.0)))
+        else:
+            bounds = ((-30.0, 20.0), (0.0, 40.0))
+        # Strongest competitors at the current thresholds are checked first;
+        # with filters on, only the cities that pass them compete
+        priority = np.argsort(score, kind="stable")
+        T_in = T_c if candidates is None else T_c[candidates]
+        st.session_state["regions"] = (regions_key, winning_regions(T_in, picked_at, prefs, *bounds, priority=priority))
+    cached_regions = st.session_state.get("regions")
+    if cached_regions is not None and cached_regions[0] == regions_key:
+        regions = cached_regions[1]
+        to_unit = c_to_f if unit == "°F" else (lambda c: c)
+        if not regions.rects:
+            st.write(f"{picked_row['City']} is not the #1 match anywhere within the slider ranges.")
+        else:
+            rect_df = pd.DataFrame(
+                [[to_unit(w0), to_unit(w1), to_unit(s0), to_unit(s1)] for w0, w1, s0, s1 in regions.rects],
+                columns=[f"Winter ≤ from ({unit})", "…to below", f"Summer ≥ above ({unit})", "…up to"],
+            ).round(1)
+            st.dataframe(rect_df, hide_index=True, use_container_width=True)
+            here = regions.contains(winter_thresh, summer_thresh)
+            st.caption(
+                f"{len(regions.rects)} region(s), {regions.share():.1%} of the slider area with winter below summer; "
+                f"the current setting is {'inside' if here else 'outside'} them."
+            )
+
+rec.flush()
+if instrument:
+    with st.sidebar.expander("Stage timings", expanded=True):
+        st.dataframe(pd.DataFrame(rec.records), hide_index=True, use_container_width=True)
+        st.caption(f"Total {rec.total_ms():.1f} ms; appended to {TIMINGS_LOG}")
@@ -0,0 +1,51 @@
+"""Throughput of batch scoring: many preference profiles against one dataset.
+
+    python benchmarks/bench_batch.py [cities] [profiles] [k]
+
+Target: at least 10k profiles/sec against 100k cities.
+"""
+
+import itertools
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_temps  # noqa: E402
+from seasonfinder import CompositionIndex, season_lengths  # noqa: E402
+
+TARGET = 10_000  # profiles/sec
+
+
+def all_compositions():
+    parts = [c for c in itertools.product(range(13), repeat=3) if sum(c) <= 12]
+    parts = np.array(parts, dtype=np.int16)
+    return np.column_stack([parts, 12 - parts.sum(axis=1)])
+
+
+def main():
+    n = int(float(sys.argv[1])) if len(sys.argv) > 1 else 100_000
+    m = int(float(sys.argv[2])) if len(sys.argv) > 2 else 100_000
+    k = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+    _, T = make_temps(n)
+    rng = np.random.default_rng(0)
+    profiles = all_compositions()[rng.integers(0, 455, m)]
+
+    t0 = time.perf_counter()
+    buckets = CompositionIndex(*season_lengths(T, 5.0, 20.0))
+    t1 = time.perf_counter()
+    buckets.top_k_batch(profiles, k)
+    t2 = time.perf_counter()
+
+    rate = m / (t2 - t1)
+    print(f"cities={n} profiles={m} k={k}")
+    print(f"classify + bucket: {(t1 - t0) * 1e3:8.1f} ms (once)")
+    print(f"batch top-k:       {(t2 - t1) * 1e3:8.1f} ms  -> {rate:,.0f} profiles/sec")
+    return 0 if rate >= TARGET else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""Cold-start time of the headless core and CLI.
+
+    python benchmarks/bench_coldstart.py [runs]
+
+Each measurement is a fresh interpreter, so it includes every import. Also
+checks that importing the core and running `rank` never pulls in pandas or
+Streamlit.
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE = os.path.join(ROOT, "cities_sample.csv")
+
+CASES = [
+    ("python (empty)", ["-c", "pass"]),
+    ("import numpy", ["-c", "import numpy"]),
+    ("import seasonfinder", ["-c", "import seasonfinder"]),
+    ("seasonfinder rank", ["-m", "seasonfinder", "rank", SAMPLE, "-o", os.devnull]),
+    ("import pandas", ["-c", "import pandas"]),
+]
+
+HEAVY_CHECK = (
+    "import sys, seasonfinder, seasonfinder.cli, seasonfinder.data; "
+    "heavy = [m for m in ('pandas', 'streamlit') if m in sys.modules]; "
+    "print(','.join(heavy))"
+)
+
+
+def wall(args, runs):
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=ROOT, check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 7
+    for name, args in CASES:
+        print(f"{name:<22} {wall(args, runs) * 1e3:8.1f} ms (median of {runs})")
+    heavy = subprocess.run(
+        [sys.executable, "-c", HEAVY_CHECK], cwd=ROOT, check=True, capture_output=True, text=True
+    ).stdout.strip()
+    if heavy:
+        print(f"FAIL: core imports pulled in {heavy}")
+        return 1
+    print("core imports: numpy only")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""Daily-resolution classification: time and peak memory.
+
+    python benchmarks/bench_daily.py [rows]
+
+Builds N×365 float32 daily temperatures by interpolating the synthetic
+monthly cycle (plus day-to-day noise), then compares the chunked float32
+`day_lengths` with classifying the whole float64 matrix in one pass.
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_temps  # noqa: E402
+from seasonfinder.daily import MONTH_DAYS, day_lengths  # noqa: E402
+from seasonfinder.seasons import season_codes  # noqa: E402
+
+
+def make_daily(n, seed=0):
+    _, T = make_temps(n, seed)
+    mid = np.cumsum(MONTH_DAYS) - MONTH_DAYS / 2
+    days = np.arange(365) + 0.5
+    # Piecewise-linear between month midpoints, wrapping Dec -> Jan
+    x = np.concatenate((mid - 365, mid, mid + 365))
+    D = np.empty((n, 365), dtype=np.float32)
+    for i, j in enumerate(np.searchsorted(x, days)):
+        w = (days[i] - x[j - 1]) / (x[j] - x[j - 1])
+        D[:, i] = T[:, (j - 1) % 12] * (1 - w) + T[:, j % 12] * w
+    D += np.random.default_rng(seed).normal(0, 1.5, D.shape).astype(np.float32)
+    return np.round(D, 1)
+
+
+def unchunked(D, w, s):
+    codes = season_codes(D.astype(float), w, s)
+    return np.stack([(codes == c).sum(axis=1) for c in range(4)])
+
+
+def measure(fn, *args):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    out = fn(*args)
+    seconds = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return out, seconds, peak
+
+
+def main():
+    n = int(float(sys.argv[1])) if len(sys.argv) > 1 else 100_000
+    D = make_daily(n)
+    print(f"rows={n} daily matrix={D.nbytes / 2**20:.1f} MiB (float32)")
+    a, t_new, p_new = measure(day_lengths, D, 5.0, 20.0)
+    b, t_old, p_old = measure(unchunked, D, 5.0, 20.0)
+    assert (a == b).all()
+    print(f"one pass, float64  : {t_old:6.2f} s  {p_old / 2**20:8.1f} MiB peak")
+    print(f"chunked, float32   : {t_new:6.2f} s  {p_new / 2**20:8.1f} MiB peak")
+
+
+if __name__ == "__main__":
+    main()
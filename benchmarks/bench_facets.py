@@ -0,0 +1,54 @@
+"""Facet filters: indexed category rows vs. string comparison per rerun.
+
+    python benchmarks/bench_facets.py [rows]
+
+Times building the dataset's facet indexes, then Country selections (alone
+and combined with a bounding box) through `Dataset.filter_rows`, against
+`isin` over the raw string column, and checks both give the same rows.
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_frame  # noqa: E402
+from seasonfinder.data import Dataset  # noqa: E402
+
+BOX = ("bbox", 20.0, 50.0, -130.0, -60.0)
+
+
+def timed(fn, repeat=20):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return out, best * 1e3
+
+
+def main():
+    n = int(float(sys.argv[1])) if len(sys.argv) > 1 else 1_000_000
+    df = make_frame(n)
+    country = df["Country"].to_numpy()
+
+    t0 = time.perf_counter()
+    ds = Dataset(df, key=("bench", n))
+    print(f"rows={n} dataset build: {time.perf_counter() - t0:.2f} s, facets={list(ds.facets)}")
+
+    for values in [("USA",), ("USA", "CAN", "MEX")]:
+        facets = (("Country", values),)
+        rows, ms = timed(lambda: ds.filter_rows(facets=facets))
+        ref, ref_ms = timed(lambda: np.flatnonzero(np.isin(country, values)))
+        assert np.array_equal(rows, ref)
+        print(f"{'+'.join(values):<12}: {len(rows):>7} rows in {ms:.2f} ms (isin: {ref_ms:.1f} ms)")
+
+        rows, ms = timed(lambda: ds.filter_rows(BOX, facets))
+        print(f"{'':<12}  with bbox: {len(rows):>7} rows in {ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
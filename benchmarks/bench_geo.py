@@ -0,0 +1,51 @@
+"""Radius and bounding-box queries on the coordinate grid index.
+
+    python benchmarks/bench_geo.py [points]
+
+Builds a GridIndex over uniformly spread points and times a few queries
+(including ones across the antimeridian and over a pole), checking each
+against a brute-force scan of every point.
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from seasonfinder.geo import GridIndex, haversine_km  # noqa: E402
+
+RADII = [(39.74, -104.99, 500), (0.0, 179.9, 300), (89.5, 0.0, 200), (-60.0, -170.0, 2000)]
+BOXES = [(35, 45, -110, -95), (-10, 10, 170, -170), (80, 90, -180, 180), (-10, 10, 10.5, 10.2), (0, 5, 170, 180)]
+
+
+def main():
+    n = int(float(sys.argv[1])) if len(sys.argv) > 1 else 2_000_000
+    rng = np.random.default_rng(0)
+    lat = np.degrees(np.arcsin(rng.uniform(-1, 1, n)))  # uniform over the sphere
+    lon = rng.uniform(-180, 180, n)
+
+    t0 = time.perf_counter()
+    index = GridIndex(lat, lon)
+    print(f"points={n} build: {time.perf_counter() - t0:.2f} s, {index.nbytes / 2**20:.0f} MiB")
+
+    for la, lo, km in RADII:
+        t0 = time.perf_counter()
+        rows, _ = index.radius(la, lo, km)
+        ms = (time.perf_counter() - t0) * 1e3
+        assert np.array_equal(rows, np.flatnonzero(haversine_km(la, lo, lat, lon) <= km))
+        print(f"radius {km:>5} km of ({la}, {lo}): {len(rows):>7} rows in {ms:.1f} ms")
+
+    for south, north, west, east in BOXES:
+        t0 = time.perf_counter()
+        rows = index.bbox(south, north, west, east)
+        ms = (time.perf_counter() - t0) * 1e3
+        in_lon = (lon - west) % 360 <= (east - west) % 360 if east - west < 360 else np.ones(n, bool)
+        assert np.array_equal(rows, np.flatnonzero((lat >= south) & (lat <= north) & in_lon))
+        print(f"bbox {(south, north, west, east)}: {len(rows):>7} rows in {ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Streaming ingest of station observations: throughput and peak memory.
+
+    python benchmarks/bench_ingest.py [stations] [days] [chunksize]
+
+Writes a synthetic hourly observation file (station, timestamp, temp) to a
+temporary directory, aggregates it with `aggregate_observations`, and reports
+rows per second and the tracemalloc peak, which stays near one chunk however
+long the file is.
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from seasonfinder.ingest import aggregate_observations  # noqa: E402
+
+
+def write_observations(path, stations, days, seed=0):
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    hours = pd.date_range("2020-01-01", periods=days * 24, freq="h")
+    stamps = hours.strftime("%Y-%m-%dT%H:%M").to_numpy()
+    doy = hours.dayofyear.to_numpy()
+    base = rng.uniform(-5, 25, stations)
+    amp = rng.uniform(2, 15, stations)
+    with open(path, "w") as f:
+        f.write("station,timestamp,temp\n")
+        for s in range(stations):
+            temps = base[s] + amp[s] * np.sin(2 * np.pi * (doy - 110) / 365) + rng.normal(0, 3, len(hours))
+            f.writelines(f"ST{s:05d},{t},{v:.1f}\n" for t, v in zip(stamps, temps))
+    return stations * len(hours)
+
+
+def main():
+    stations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 365
+    chunksize = int(sys.argv[3]) if len(sys.argv) > 3 else 500_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "obs.csv")
+        rows = write_observations(path, stations, days)
+        size = os.path.getsize(path)
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        df = aggregate_observations(path, chunksize=chunksize)
+        seconds = time.perf_counter() - t0
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    print(f"{rows} readings ({size / 2**20:.0f} MiB) -> {len(df)} stations, chunksize={chunksize}")
+    print(f"{seconds:.2f} s ({rows / seconds / 1e6:.2f} M rows/s), peak {peak / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Speedup of sharded multi-process scoring versus worker count.
+
+    python benchmarks/bench_parallel.py [rows] [max_workers]
+
+Compares one query through ShardedScorer at 1, 2, 4, ... workers against the
+single-process NumPy path, and checks the merged top K is identical.
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_temps  # noqa: E402
+from seasonfinder import distance, season_lengths, top_k  # noqa: E402
+from seasonfinder.parallel import ShardedScorer  # noqa: E402
+
+QUERY = (5.0, 20.0, (5, 2, 3, 2))
+K = 20
+
+
+def single(T):
+    w, s, prefs = QUERY
+    dist = distance(np.stack(season_lengths(T, w, s), axis=1), prefs)
+    return top_k(dist, K)
+
+
+def best_of(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main():
+    n = int(float(sys.argv[1])) if len(sys.argv) > 1 else 4_000_000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    _, T = make_temps(n)
+    base, (ref_rows, _) = best_of(lambda: single(T))
+    print(f"rows={n} cpus={os.cpu_count()}")
+    print(f"{'single process':<16} {base * 1e3:9.1f} ms   1.00x")
+
+    workers = 1
+    while workers <= max_workers:
+        with ShardedScorer(T, workers=workers) as scorer:
+            scorer.top_k(*QUERY, k=K)  # warm the pool
+            t, (rows, _) = best_of(lambda: scorer.top_k(*QUERY, k=K))
+        assert (rows == ref_rows).all(), "sharded top K differs from single-process result"
+        print(f"{f'{workers} worker(s)':<16} {t * 1e3:9.1f} ms   {base / t:.2f}x")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Inverse query: where in threshold space a city ranks first.
+
+    python benchmarks/bench_regions.py [rows]
+
+Times `winning_regions` over the app's slider ranges for the current #1 and
+for a mid-table city, and checks random threshold pairs (winter below summer,
+including ones on the slider bounds) against a full reclassification.
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_temps  # noqa: E402
+from seasonfinder.ranking import top_k  # noqa: E402
+from seasonfinder.regions import winning_regions  # noqa: E402
+from seasonfinder.scoring import distance  # noqa: E402
+from seasonfinder.seasons import season_lengths  # noqa: E402
+
+BOUNDS = ((-30.0, 20.0), (0.0, 40.0))
+
+
+def winner(T, w, s, prefs):
+    return top_k(distance(np.stack(season_lengths(T, w, s), axis=1), prefs), 1)[0][0]
+
+
+def main():
+    n = int(float(sys.argv[1])) if len(sys.argv) > 1 else 100_000
+    _, T = make_temps(n)
+    prefs = (4, 3, 3, 2)
+    order = np.argsort(distance(np.stack(season_lengths(T, 5.0, 20.0), axis=1), prefs), kind="stable")
+    rng = np.random.default_rng(0)
+    print(f"rows={n} distinct temps={len(np.unique(T))}")
+    for label, row in [("current #1", order[0]), ("rank 1000", order[min(999, n - 1)])]:
+        t0 = time.perf_counter()
+        regions = winning_regions(T, row, prefs, *BOUNDS, priority=order)
+        seconds = time.perf_counter() - t0
+        pairs = [(BOUNDS[0][1], rng.uniform(BOUNDS[0][1], BOUNDS[1][1])), (BOUNDS[0][0], BOUNDS[1][0])]
+        while len(pairs) < 7:
+            w, s = rng.uniform(*BOUNDS[0]), rng.uniform(*BOUNDS[1])
+            if w < s:
+                pairs.append((w, s))
+        for w, s in pairs:
+            assert (winner(T, w, s, prefs) == row) == regions.contains(w, s), (w, s)
+        assert all(w0 < w1 and s0 < s1 and w0 < s1 for w0, w1, s0, s1 in regions.rects)
+        print(
+            f"{label:<11}: {seconds:.2f} s for {regions.n_cells} cells -> "
+            f"{len(regions.rects)} rectangles, {regions.share():.2%} of the area"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Peak memory of the old frame-copy results path versus Results arrays.
+
+    python benchmarks/bench_results_memory.py [rows] [extra_columns]
+
+Builds a synthetic upload with `extra_columns` metadata columns, then measures
+(with tracemalloc) what one rerun allocates to produce the top-20 table.
+"""
+
+import os
+import sys
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_frame  # noqa: E402
+from seasonfinder.data import TEMP_COLS  # noqa: E402
+from seasonfinder.results import Results  # noqa: E402
+from seasonfinder.scoring import MAX_SCORE, CompositionIndex  # noqa: E402
+from seasonfinder.seasons import SeasonIndex  # noqa: E402
+
+
+def legacy(df, lengths, score):
+    # What app.py did before: four copies of the full frame per rerun
+    out = df.copy()
+    for name, arr in zip(["Winter", "Spring", "Summer", "Autumn"], lengths):
+        out[name] = arr
+    out["Score"] = score
+    out2 = out.copy()
+    out2["Score"] = MAX_SCORE - out2["Score"]
+    out_sorted = out2.sort_values("Score", ascending=False).reset_index(drop=True)
+    out_sorted["Rank"] = np.arange(1, len(out_sorted) + 1)
+    out_sorted["Match %"] = (out_sorted["Score"] / MAX_SCORE * 100).clip(0, 100).round(1)
+    top_for_pick = out_sorted.head(20).copy()
+    return top_for_pick
+
+
+def arrays(df, lengths, buckets, prefs):
+    results = Results(*lengths, buckets.city_distances(prefs))
+    rows, _ = buckets.top_k(prefs, 20)
+    return results.frame(df, rows)
+
+
+def peak(fn, *args):
+    tracemalloc.start()
+    fn(*args)
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak_bytes
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    extra = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    df = make_frame(n, extra_columns=extra)
+    T = df[TEMP_COLS].to_numpy(dtype=float)
+    lengths = SeasonIndex(T).lengths(5.0, 20.0)
+    buckets = CompositionIndex(*lengths)
+    prefs = (5, 2, 3, 2)
+    score = buckets.city_distances(prefs)
+
+    old = peak(legacy, df, lengths, score)
+    new = peak(arrays, df, lengths, buckets, prefs)
+    print(f"rows={n} extra_columns={extra} frame={df.memory_usage(deep=True).sum() / 2**20:.1f} MiB")
+    print(f"frame copies : {old / 2**20:8.1f} MiB peak")
+    print(f"result arrays: {new / 2**20:8.1f} MiB peak  ({old / max(new, 1):.0f}x less)")
+
+
+if __name__ == "__main__":
+    main()
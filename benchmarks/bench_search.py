@@ -0,0 +1,47 @@
+"""Fuzzy name search over the trigram index.
+
+    python benchmarks/bench_search.py [rows]
+
+Times building a TrigramIndex over synthetic "City Country" names, then a
+few queries (exact, misspelled, word-only), checking that the intended city
+comes first where the query names one.
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_frame  # noqa: E402
+from seasonfinder.search import TrigramIndex  # noqa: E402
+
+
+def main():
+    n = int(float(sys.argv[1])) if len(sys.argv) > 1 else 1_000_000
+    df = make_frame(n)
+    names = (df["City"] + " " + df["Country"]).to_numpy()
+
+    t0 = time.perf_counter()
+    index = TrigramIndex(names)
+    print(f"rows={n} build: {time.perf_counter() - t0:.2f} s, {index.nbytes / 2**20:.0f} MiB, {len(index.grams)} trigrams")
+
+    target = n // 3
+    city, country = df["City"].iloc[target], df["Country"].iloc[target]
+    queries = [
+        (f"{city} {country}", target),
+        (f"{city.lower().replace('city', 'cty')} {country.lower()}", target),
+        (city.split()[1], None),
+        (country, None),
+    ]
+    for query, expected in queries:
+        t0 = time.perf_counter()
+        rows, scores = index.search(query, k=10)
+        ms = (time.perf_counter() - t0) * 1e3
+        if expected is not None:
+            assert rows[0] == expected, (query, names[rows[:3]])
+        print(f"{query!r:<24}: {ms:6.1f} ms -> {names[rows[0]]!r} ({scores[0]:.2f})")
+
+
+if __name__ == "__main__":
+    main()
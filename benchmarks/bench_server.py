@@ -0,0 +1,78 @@
+"""Load test for the JSON scoring service.
+
+    python benchmarks/bench_server.py [cities] [clients] [requests_per_client]
+
+Starts the server in-process on a free port, then runs concurrent clients on
+keep-alive connections with a mix of threshold pairs and preferences, and
+reports throughput plus client- and server-side p50/p99 latency.
+"""
+
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_temps  # noqa: E402
+from seasonfinder.server import make_server  # noqa: E402
+
+THRESHOLDS = [(5.0, 20.0), (4.0, 20.0), (5.0, 22.0), (0.0, 18.0)]
+PREFS = [(5, 2, 3, 2), (3, 3, 3, 3), (0, 2, 8, 2), (6, 2, 2, 2)]
+
+
+def client(port, n, seed, latencies):
+    rng = np.random.default_rng(seed)
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    for _ in range(n):
+        w, s = THRESHOLDS[rng.integers(len(THRESHOLDS))]
+        p = PREFS[rng.integers(len(PREFS))]
+        t0 = time.perf_counter()
+        conn.request("GET", f"/rank?winter_thresh={w}&summer_thresh={s}&w={p[0]}&sp={p[1]}&su={p[2]}&fa={p[3]}&k=10")
+        resp = conn.getresponse()
+        body = resp.read()
+        latencies.append(time.perf_counter() - t0)
+        assert resp.status == 200, body
+    conn.close()
+
+
+def main():
+    n = int(float(sys.argv[1])) if len(sys.argv) > 1 else 100_000
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    per_client = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+
+    _, T = make_temps(n)
+    labels = {"City": [f"City {i}" for i in range(n)], "Country": ["X"] * n}
+    server = make_server(labels, T, port=0)
+    port = server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    latencies = []
+    threads = [threading.Thread(target=client, args=(port, per_client, i, latencies)) for i in range(clients)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    conn.request("GET", "/stats")
+    stats = json.loads(conn.getresponse().read())
+    server.shutdown()
+
+    total = clients * per_client
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1e3
+    print(f"cities={n} clients={clients} requests={total}")
+    print(f"throughput: {total / elapsed:,.0f} req/s")
+    print(f"client latency: p50 {p50:.2f} ms, p99 {p99:.2f} ms")
+    print(f"server latency: p50 {stats['p50_ms']} ms, p99 {stats['p99_ms']} ms")
+    print(f"batches: {stats['batches']} (mean {stats['mean_batch']}, largest {stats['largest_batch']})")
+
+
+if __name__ == "__main__":
+    main()
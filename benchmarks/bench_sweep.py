@@ -0,0 +1,58 @@
+"""Threshold sweep: a grid of (winter, summer) pairs versus one rerun per cell.
+
+    python benchmarks/bench_sweep.py [rows] [grid_side]
+
+Checks every cell's winner against classifying from scratch (on a sample of
+cells) and reports the sweep time for grid_side² cells.
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_temps  # noqa: E402
+from seasonfinder.ranking import rank_of, top_k  # noqa: E402
+from seasonfinder.scoring import distance  # noqa: E402
+from seasonfinder.seasons import SeasonIndex, season_lengths  # noqa: E402
+from seasonfinder.sweep import threshold_sweep  # noqa: E402
+
+
+def per_cell(T, w, s, prefs, focus):
+    dist = distance(np.stack(season_lengths(T, w, s), axis=1), prefs)
+    rows, _ = top_k(dist, 1)
+    return rows[0], rank_of(dist, focus)
+
+
+def main():
+    n = int(float(sys.argv[1])) if len(sys.argv) > 1 else 100_000
+    side = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    _, T = make_temps(n)
+    index = SeasonIndex(T)
+    prefs = (5, 2, 3, 2)
+    winter = np.linspace(0, 10, side)
+    summer = np.linspace(15, 25, side)
+    focus = 0
+
+    t0 = time.perf_counter()
+    sweep = threshold_sweep(index, winter, summer, prefs, focus=focus)
+    seconds = time.perf_counter() - t0
+
+    rng = np.random.default_rng(0)
+    cells = [(rng.integers(side), rng.integers(side)) for _ in range(10)]
+    t0 = time.perf_counter()
+    for i, j in cells:
+        row, rank = per_cell(T, winter[i], summer[j], prefs, focus)
+        assert row == sweep.top_rows[i, j] and rank == sweep.focus_ranks[i, j], (i, j)
+    rerun = (time.perf_counter() - t0) / len(cells)
+
+    print(f"rows={n} grid={side}x{side}")
+    print(f"sweep          : {seconds:.3f} s")
+    print(f"rerun per cell : {rerun * 1e3:.1f} ms  (x{side * side} = {rerun * side * side:.1f} s)")
+
+
+if __name__ == "__main__":
+    main()
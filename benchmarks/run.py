@@ -0,0 +1,241 @@
+"""Stage-by-stage SeasonFinder benchmark.
+
+    python benchmarks/run.py                       # 1e3..1e5 rows, compare to baseline
+    python benchmarks/run.py --sizes 1e6 1e7       # bigger datasets
+    python benchmarks/run.py --save-baseline       # record this machine's numbers
+
+Each stage of the app's pipeline is timed on its own (best of --repeat runs)
+and then run once more under tracemalloc for its peak allocation. Results are
+compared against benchmarks/baseline.json; any stage slower than --tolerance
+times its baseline is reported and makes the script exit non-zero.
+
+Every size is also checked against the original app's season formula: the
+SeasonIndex, season_lengths, season_codes and season_masks answers must all
+match it (with some months blanked to NaN), or the script stops with an
+AssertionError.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_frame  # noqa: E402
+from seasonfinder.data import TEMP_COLS  # noqa: E402
+from seasonfinder.ranking import CountingRanker  # noqa: E402
+from seasonfinder.results import Results  # noqa: E402
+from seasonfinder.scoring import CompositionIndex  # noqa: E402
+from seasonfinder.seasons import (  # noqa: E402
+    SEASON_LABELS,
+    SeasonIndex,
+    season_codes,
+    season_lengths,
+    season_masks,
+)
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+WINTER_C, SUMMER_C = 5.0, 20.0
+PREFS = (5, 2, 3, 2)
+TOP_K = 20
+
+# Threshold pairs for the rules check: the defaults, thresholds equal to
+# data values (0.1° steps), °F conversions, and narrow and wide gaps
+RULE_THRESHOLDS = [
+    (WINTER_C, SUMMER_C), (0.0, 0.1), (-10.3, 25.7), (12.0, 12.5), ((41 - 32) / 1.8, (68 - 32) / 1.8), (-60.0, 50.0),
+]
+
+
+# Each stage reads what it needs from `ctx` and stores what it produces there.
+
+def stage_parse(ctx):
+    ctx["df"] = pd.read_csv(ctx["path"])
+    ctx["T"] = ctx["df"][TEMP_COLS].to_numpy(dtype=float)
+
+
+def stage_delta(ctx):
+    T = ctx["T"]
+    ctx["delta"] = np.roll(T, -1, axis=1) - T
+
+
+def stage_index(ctx):
+    ctx["index"] = SeasonIndex(ctx["T"])
+
+
+def stage_classify(ctx):
+    ctx["lengths"] = ctx["index"].lengths(WINTER_C, SUMMER_C)
+
+
+def stage_score(ctx):
+    ctx["buckets"] = CompositionIndex(*ctx["lengths"])
+    ctx["dist"] = ctx["buckets"].city_distances(PREFS)
+
+
+def stage_rank(ctx):
+    ctx["top_rows"], _ = ctx["buckets"].top_k(PREFS, TOP_K)
+    ctx["ranker"] = CountingRanker(ctx["dist"])
+    ctx["ranker"].histogram()
+
+
+def stage_label(ctx):
+    ctx["codes"] = season_codes(ctx["T"], WINTER_C, SUMMER_C)
+
+
+def stage_render_prep(ctx):
+    results = Results(*ctx["lengths"], ctx["dist"])
+    top = results.frame(ctx["df"], ctx["top_rows"])
+    pd.DataFrame(SEASON_LABELS[ctx["codes"][ctx["top_rows"]]], index=top["City"])
+
+
+STAGES = [
+    ("parse", stage_parse),
+    ("delta", stage_delta),
+    ("index", stage_index),
+    ("classify", stage_classify),
+    ("score", stage_score),
+    ("rank", stage_rank),
+    ("label", stage_label),
+    ("render_prep", stage_render_prep),
+]
+
+
+def baseline_lengths(T_c, winter_thresh, summer_thresh):
+    """(winter, spring, summer, autumn) exactly as the original app.py computed them."""
+    is_winter = T_c <= winter_thresh
+    is_summer = T_c >= summer_thresh
+    is_transition = (~is_winter) & (~is_summer)
+    delta = np.roll(T_c, -1, axis=1) - T_c  # next_month - this_month
+    is_flat = is_transition & (delta == 0)
+    flat_len = is_flat.sum(axis=1)
+    spring_len = (is_transition & (delta > 0)).sum(axis=1) + flat_len // 2
+    fall_len = (is_transition & (delta < 0)).sum(axis=1) + (flat_len - flat_len // 2)
+    return is_winter.sum(axis=1), spring_len, is_summer.sum(axis=1), fall_len
+
+
+def check_rules(T, seed=0):
+    """Assert every season counter agrees with baseline_lengths() on T.
+
+    A copy of T gets ~2% of its months (and one whole row) set to NaN first.
+    """
+    rng = np.random.default_rng(seed)
+    T = T.copy()
+    T[rng.random(T.shape) < 0.02] = np.nan
+    T[:1] = np.nan
+    index = SeasonIndex(T)
+    for winter, summer in RULE_THRESHOLDS:
+        expected = baseline_lengths(T, winter, summer)
+        codes = season_codes(T, winter, summer)
+        masks = season_masks(T, winter, summer)
+        got = {
+            "SeasonIndex": index.lengths(winter, summer),
+            "season_lengths": season_lengths(T, winter, summer),
+            "season_codes": [(codes == code).sum(axis=1) for code in range(4)],
+            "season_masks": [((m[:, None] >> np.arange(12)) & 1).sum(axis=1) for m in masks],
+        }
+        for name, lengths in got.items():
+            for season, a, b in zip(SEASON_LABELS, lengths, expected):
+                bad = np.flatnonzero(a != b)
+                assert not len(bad), f"{name} {season} at ({winter}, {summer}) differs in rows {bad[:5]}"
+
+
+def measure(fn, ctx, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(ctx)
+        best = min(best, time.perf_counter() - t0)
+    tracemalloc.start()
+    fn(ctx)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def run_size(n, repeat, seed=0):
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = {"path": os.path.join(tmp, "cities.csv")}
+        make_frame(n, seed=seed).to_csv(ctx["path"], index=False)
+        rows = []
+        for name, fn in STAGES:
+            seconds, peak = measure(fn, ctx, repeat)
+            rows.append({
+                "stage": name,
+                "rows": n,
+                "seconds": seconds,
+                "rows_per_sec": n / seconds if seconds > 0 else float("inf"),
+                "peak_bytes": peak,
+            })
+        check_rules(ctx["T"], seed=seed)
+    return rows
+
+
+def compare(results, baseline, tolerance):
+    known = {(b["stage"], b["rows"]): b for b in baseline}
+    regressions = []
+    for r in results:
+        b = known.get((r["stage"], r["rows"]))
+        if b is None:
+            r["vs_baseline"] = None
+            continue
+        r["vs_baseline"] = r["seconds"] / b["seconds"] if b["seconds"] > 0 else None
+        # Ignore sub-millisecond noise
+        if r["vs_baseline"] and r["vs_baseline"] > tolerance and r["seconds"] > 1e-3:
+            regressions.append(r)
+    return regressions
+
+
+def print_table(results):
+    print(f"{'stage':<12} {'rows':>10} {'ms':>10} {'rows/s':>14} {'peak MiB':>10} {'vs base':>8}")
+    for r in results:
+        ratio = r.get("vs_baseline")
+        ratio = f"{ratio:.2f}x" if ratio else "-"
+        print(
+            f"{r['stage']:<12} {r['rows']:>10} {r['seconds'] * 1e3:>10.2f} "
+            f"{r['rows_per_sec']:>14,.0f} {r['peak_bytes'] / 2**20:>10.1f} {ratio:>8}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", type=float, default=[1e3, 1e4, 1e5])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--tolerance", type=float, default=1.5, help="allowed slowdown vs baseline")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args(argv)
+
+    results = []
+    for n in args.sizes:
+        results.extend(run_size(int(n), args.repeat))
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump([{k: r[k] for k in ("stage", "rows", "seconds", "peak_bytes")} for r in results], f, indent=1)
+        print_table(results)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+
+    regressions = []
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+    print_table(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=1)
+    for r in regressions:
+        print(f"REGRESSION: {r['stage']} at {r['rows']} rows is {r['vs_baseline']:.2f}x baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""Synthetic City,Country,T1..T12 datasets for benchmarking.
+
+    python benchmarks/synthetic.py 1000000 big.csv
+
+Temperatures follow a latitude-driven annual cycle: colder and more seasonal
+away from the equator, with the southern hemisphere six months out of phase.
+A small share of rows are deliberate edge cases: perfectly flat climates and
+runs of identical consecutive months, which exercise the flat-month split.
+"""
+
+import sys
+
+import numpy as np
+
+COUNTRIES = ["USA", "CAN", "MEX", "BRA", "ARG", "GBR", "FRA", "DEU", "ZAF", "AUS", "NZL", "JPN", "IND", "CHN", "RUS"]
+
+
+def make_temps(n, seed=0, flat_share=0.01):
+    """(lat, T) for n synthetic cities; T is n×12 °C rounded to 0.1."""
+    rng = np.random.default_rng(seed)
+    lat = rng.uniform(-60, 70, n)
+    abs_lat = np.abs(lat)
+    mean = 28 - 0.45 * abs_lat + rng.normal(0, 3, n)
+    amplitude = 1 + 0.35 * abs_lat + rng.normal(0, 2, n).clip(-1, None)
+    # Warmest month ~July in the north, ~January in the south
+    peak = np.where(lat >= 0, 6.5, 0.5) + rng.normal(0, 0.4, n)
+    month = np.arange(12) + 0.5
+    T = mean[:, None] + amplitude[:, None] / 2 * np.cos(2 * np.pi * (month[None, :] - peak[:, None]) / 12)
+    T += rng.normal(0, 0.8, T.shape)
+
+    n_flat = int(n * flat_share)
+    if n_flat:
+        rows = rng.choice(n, n_flat, replace=False)
+        half = n_flat // 2
+        T[rows[:half]] = T[rows[:half], :1]  # same temperature all year
+        # a run of 2-4 identical months somewhere in the year
+        for r in rows[half:]:
+            start, length = rng.integers(0, 12), rng.integers(2, 5)
+            T[r, (start + np.arange(length)) % 12] = T[r, start]
+    return lat, np.round(T, 1)
+
+
+def make_frame(n, seed=0, extra_columns=0, flat_share=0.01):
+    import pandas as pd
+
+    rng = np.random.default_rng(seed + 1)
+    lat, T = make_temps(n, seed, flat_share)
+    cols = {
+        "City": np.char.add("City ", np.arange(n).astype(str)),
+        "Country": rng.choice(COUNTRIES, n),
+        "Lat": np.round(lat, 3),
+        "Lon": np.round(rng.uniform(-180, 180, n), 3),
+    }
+    for j in range(extra_columns):
+        cols[f"meta{j}"] = rng.random(n)
+    for i in range(12):
+        cols[f"T{i + 1}"] = T[:, i]
+    return pd.DataFrame(cols)
+
+
+def main():
+    n = int(float(sys.argv[1])) if len(sys.argv) > 1 else 10_000
+    path = sys.argv[2] if len(sys.argv) > 2 else f"synthetic_{n}.csv"
+    make_frame(n).to_csv(path, index=False)
+    print(f"wrote {n} rows to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""SeasonFinder: match cities to preferred season lengths.
+
+The core (classification, scoring, ranking) only needs NumPy; pandas is
+imported lazily by the dataset loaders and Streamlit only by app.py.
+"""
+
+from .daily import day_distance, day_lengths
+from .geo import GridIndex, haversine_km
+from .ranking import CountingRanker, full_ranks, rank_of, top_k
+from .regions import winning_regions
+from .scoring import MAX_SCORE, CompositionIndex, contiguity_penalty, distance, rank_profiles
+from .search import TrigramIndex
+from .seasons import SEASON_LABELS, SeasonIndex, season_codes, season_lengths, season_masks
+from .sweep import threshold_sweep
+
+__all__ = [
+    "MAX_SCORE",
+    "SEASON_LABELS",
+    "CompositionIndex",
+    "CountingRanker",
+    "GridIndex",
+    "SeasonIndex",
+    "TrigramIndex",
+    "contiguity_penalty",
+    "day_distance",
+    "day_lengths",
+    "distance",
+    "full_ranks",
+    "haversine_km",
+    "rank_of",
+    "rank_profiles",
+    "season_codes",
+    "season_lengths",
+    "season_masks",
+    "threshold_sweep",
+    "top_k",
+    "winning_regions",
+]
@@ -0,0 +1,123 @@
+"""A small LRU cache bounded by bytes instead of entry count."""
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+class ByteLRU:
+    """Least-recently-used cache that evicts once `max_bytes` is exceeded.
+
+    Values are stored together with the size the caller reports for them, so
+    the budget covers whatever the caller counts (a DataFrame's memory usage,
+    an array's nbytes, ...). A value bigger than the whole budget is still
+    kept, alone (everything unpinned is evicted for it), so the entry being
+    used is never rebuilt on every lookup; `stats()["over_budget"]` says when
+    that is happening. Safe to share between Streamlit sessions:
+    concurrent get_or_create() misses on one key run a single build, and the
+    other callers wait for its result.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = int(max_bytes)
+        self._items = OrderedDict()  # key -> (value, nbytes)
+        self._pinned = set()
+        self._building = {}  # key -> Future of the build in flight
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key, value, nbytes, pinned=False):
+        """Store `value`; pinned entries count against the budget but are never evicted."""
+        nbytes = int(nbytes)
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+                self._pinned.discard(key)
+            for victim in list(self._items):
+                if self.bytes + nbytes <= self.max_bytes:
+                    break
+                if victim in self._pinned:
+                    continue
+                _, evicted = self._items.pop(victim)
+                self.bytes -= evicted
+                self.evictions += 1
+            self._items[key] = (value, nbytes)
+            self.bytes += nbytes
+            if pinned:
+                self._pinned.add(key)
+        return value
+
+    def get_or_create(self, key, build, sizeof, pinned=False):
+        """Return the cached value for `key`, building and storing it on a miss.
+
+        Only one caller builds a given key at a time; others asking for it
+        meanwhile get the same value (or exception) when it is done.
+        """
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return item[0]
+            pending = self._building.get(key)
+            if pending is None:
+                self.misses += 1
+                pending = self._building[key] = Future()
+                builder = True
+            else:
+                self.hits += 1  # shares the build in flight
+                builder = False
+        if not builder:
+            return pending.result()
+        try:
+            value = build()
+            value = self.put(key, value, sizeof(value), pinned=pinned)
+        except BaseException as e:
+            with self._lock:
+                del self._building[key]
+            pending.set_exception(e)
+            raise
+        with self._lock:
+            del self._building[key]
+        pending.set_result(value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._pinned.clear()
+            self.bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._items),
+            "pinned": len(self._pinned),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "over_budget": self.bytes > self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,266 @@
+"""Command-line interface.
+
+    python -m seasonfinder rank cities.csv --winter 5 --summer 20 --prefs 5 2 3 2 -k 20
+    python -m seasonfinder rank cities.csv -o top.csv
+    python -m seasonfinder batch cities.csv profiles.csv -k 10 -o matches.csv
+    python -m seasonfinder serve cities.csv --port 8765
+    python -m seasonfinder ingest observations.csv -o cities.csv --stations stations.csv
+    python -m seasonfinder timings seasonfinder_timings.jsonl
+
+Reads the CSV with the stdlib csv module and scores with NumPy only, so a run
+never imports pandas or Streamlit.
+"""
+
+import argparse
+import csv
+import sys
+
+import numpy as np
+
+from .ranking import CountingRanker
+from .scoring import MAX_SCORE, CompositionIndex
+from .seasons import season_lengths
+
+SEASONS = ["Winter", "Spring", "Summer", "Autumn"]
+
+
+def f_to_c(f):
+    return (f - 32) * 5 / 9
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="seasonfinder", description="Match cities to preferred season lengths.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rank = sub.add_parser("rank", help="print or write the top K cities for one preference")
+    rank.add_argument("csv", help="City,Country,T1..T12 file (monthly means in °C)")
+    rank.add_argument("--winter", type=float, default=5.0, help="winter month if temp <= this (default 5°C)")
+    rank.add_argument("--summer", type=float, default=20.0, help="summer month if temp >= this (default 20°C)")
+    rank.add_argument("--fahrenheit", action="store_true", help="thresholds are given in °F")
+    rank.add_argument(
+        "--prefs", type=int, nargs=4, default=[5, 2, 3, 2], metavar=("W", "SP", "SU", "FA"),
+        help="preferred winter/spring/summer/autumn months, summing to 12 (default 5 2 3 2)",
+    )
+    rank.add_argument("-k", "--top", type=int, default=20, help="how many cities to return (default 20)")
+    rank.add_argument("-o", "--output", help="write CSV here instead of printing a table")
+    rank.add_argument("-j", "--workers", type=int, default=1, help="score shards in this many processes (default 1)")
+    rank.set_defaults(func=cmd_rank)
+
+    batch = sub.add_parser("batch", help="top K for every preference profile in a CSV")
+    batch.add_argument("csv", help="City,Country,T1..T12 file (monthly means in °C)")
+    batch.add_argument("profiles", help="CSV with Winter,Spring,Summer,Autumn columns, one profile per row")
+    batch.add_argument("--winter", type=float, default=5.0, help="winter month if temp <= this (default 5°C)")
+    batch.add_argument("--summer", type=float, default=20.0, help="summer month if temp >= this (default 20°C)")
+    batch.add_argument("--fahrenheit", action="store_true", help="thresholds are given in °F")
+    batch.add_argument("-k", "--top", type=int, default=20, help="cities per profile (default 20)")
+    batch.add_argument("-o", "--output", required=True, help="CSV to write (one row per profile and rank)")
+    batch.set_defaults(func=cmd_batch)
+
+    serve = sub.add_parser("serve", help="run the local JSON scoring service")
+    serve.add_argument("csv", help="City,Country,T1..T12 file (monthly means in °C)")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.set_defaults(func=cmd_serve)
+
+    ingest = sub.add_parser("ingest", help="stream station observations into City,Country,T1..T12 normals")
+    ingest.add_argument("observations", nargs="+", help="long-format CSVs: one reading per row")
+    ingest.add_argument("-o", "--output", required=True, help="CSV to write")
+    ingest.add_argument("--stations", help="CSV mapping station to City,Country")
+    ingest.add_argument("--station-col", default="station", help="station id column (default: station)")
+    ingest.add_argument("--time-col", default="timestamp", help="timestamp column (default: timestamp)")
+    ingest.add_argument("--temp-col", default="temp", help="temperature column (default: temp)")
+    ingest.add_argument("--fahrenheit", action="store_true", help="readings are in °F (output is always °C)")
+    ingest.add_argument("--daily", action="store_true", help="write D1..D365 day-of-year normals instead of T1..T12")
+    ingest.add_argument("--min-count", type=int, default=1, help="leave a month blank with fewer readings (default 1)")
+    ingest.add_argument("--chunksize", type=int, default=500_000, help="rows read at a time (default 500000)")
+    ingest.set_defaults(func=cmd_ingest)
+
+    timings = sub.add_parser("timings", help="per-stage p50/p95 from an app timings log")
+    timings.add_argument("log", help="JSON-lines file written by the app's debug panel")
+    timings.set_defaults(func=cmd_timings)
+    return parser
+
+
+def read_profiles(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        missing = [c for c in SEASONS if c not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"Missing columns in profiles CSV: {missing}")
+        profiles = []
+        for r in reader:
+            try:
+                prefs = [int(r[c]) for c in SEASONS]
+            except (TypeError, ValueError):
+                prefs = None
+            # Same rule as rank's --prefs and /rank
+            if prefs is None or min(prefs) < 0 or sum(prefs) != 12:
+                raise ValueError(
+                    f"profiles CSV line {reader.line_num}: Winter, Spring, Summer, Autumn must be "
+                    f"non-negative whole months summing to 12, got {[r[c] for c in SEASONS]}"
+                )
+            profiles.append(prefs)
+        return profiles
+
+
+def cmd_rank(args, parser):
+    if sum(args.prefs) != 12 or min(args.prefs) < 0:
+        parser.error("--prefs must be four non-negative month counts summing to 12")
+    if not np.isfinite([args.winter, args.summer]).all():
+        parser.error("--winter and --summer must be finite numbers")
+    winter_c, summer_c = args.winter, args.summer
+    if args.fahrenheit:
+        winter_c, summer_c = f_to_c(winter_c), f_to_c(summer_c)
+    if winter_c >= summer_c:
+        parser.error("--winter must be below --summer")
+
+    from .data import read_temps_csv
+
+    try:
+        labels, T = read_temps_csv(args.csv)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    if args.workers > 1:
+        from .parallel import ShardedScorer
+
+        with ShardedScorer(T, workers=args.workers) as scorer:
+            rows, dist = scorer.top_k(winter_c, summer_c, args.prefs, args.top)
+            counts = scorer.counts
+        # Only the winners' lengths are needed for the table
+        shown = season_lengths(T[rows], winter_c, summer_c)
+        lengths = [np.zeros(len(T), dtype=np.int8) for _ in SEASONS]
+        for full, part in zip(lengths, shown):
+            full[rows] = part
+    else:
+        lengths = season_lengths(T, winter_c, summer_c)
+        buckets = CompositionIndex(*lengths)
+        rows, dist = buckets.top_k(args.prefs, args.top)
+        counts = CountingRanker(buckets.city_distances(args.prefs)).counts
+
+    header = ["Rank", "City", "Country", "Score", "Match %", *SEASONS]
+    records = []
+    for i, (row, d) in enumerate(zip(rows, dist), start=1):
+        score = MAX_SCORE - int(d)
+        records.append([
+            i,
+            labels.get("City", [""] * len(T))[row],
+            labels.get("Country", [""] * len(T))[row],
+            score,
+            round(score / MAX_SCORE * 100, 1),
+            *(int(a[row]) for a in lengths),
+        ])
+
+    if args.output:
+        with open(args.output, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(records)
+        print(f"wrote {len(records)} rows to {args.output}")
+        return 0
+
+    widths = [max(len(str(x)) for x in col) for col in zip(header, *records)]
+    for line in [header, *records]:
+        print("  ".join(str(x).rjust(w) if isinstance(x, (int, float)) else str(x).ljust(w) for x, w in zip(line, widths)))
+    if len(T):
+        print(f"\n{len(T)} cities; {int(counts[0])} perfect matches")
+    return 0
+
+
+def cmd_batch(args, parser):
+    from .data import read_temps_csv
+    from .scoring import rank_profiles
+
+    if not np.isfinite([args.winter, args.summer]).all():
+        parser.error("--winter and --summer must be finite numbers")
+    winter_c, summer_c = args.winter, args.summer
+    if args.fahrenheit:
+        winter_c, summer_c = f_to_c(winter_c), f_to_c(summer_c)
+    if winter_c >= summer_c:
+        parser.error("--winter must be below --summer")
+    try:
+        labels, T = read_temps_csv(args.csv)
+        profiles = np.array(read_profiles(args.profiles), dtype=np.int16).reshape(-1, 4)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    rows, dist = rank_profiles(T, winter_c, summer_c, profiles, args.top)
+    cities = labels.get("City", [""] * len(T))
+    countries = labels.get("Country", [""] * len(T))
+    with open(args.output, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Profile", "Rank", "City", "Country", "Score", "Match %"])
+        for p, (prow, pdist) in enumerate(zip(rows, dist)):
+            for rank, (row, d) in enumerate(zip(prow, pdist), start=1):
+                if row < 0:
+                    break
+                score = MAX_SCORE - int(d)
+                writer.writerow([p, rank, cities[row], countries[row], score, round(score / MAX_SCORE * 100, 1)])
+    print(f"ranked {len(profiles)} profiles against {len(T)} cities; wrote {args.output}")
+    return 0
+
+
+def cmd_serve(args, parser):
+    from .server import serve
+
+    try:
+        serve(args.csv, args.host, args.port)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    return 0
+
+
+def cmd_ingest(args, parser):
+    from .ingest import aggregate_observations, read_stations
+
+    totals = {}
+
+    def progress(acc):
+        totals.update(read=acc.rows_read, used=acc.rows_used, bad_time=acc.rows_bad_time)
+
+    try:
+        stations = read_stations(args.stations, args.station_col) if args.stations else None
+        df = aggregate_observations(
+            args.observations,
+            station_col=args.station_col,
+            time_col=args.time_col,
+            temp_col=args.temp_col,
+            chunksize=args.chunksize,
+            daily=args.daily,
+            fahrenheit=args.fahrenheit,
+            min_count=args.min_count,
+            stations=stations,
+            progress=progress,
+        )
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    df.to_csv(args.output, index=False)
+    dropped = totals.get("read", 0) - totals.get("used", 0)
+    print(
+        f"used {totals.get('used', 0)} of {totals.get('read', 0)} readings; "
+        f"dropped {dropped} ({totals.get('bad_time', 0)} with no usable timestamp)"
+    )
+    print(f"wrote {len(df)} stations to {args.output}")
+    return 0
+
+
+def cmd_timings(args, parser):
+    from .instrument import summarize
+
+    stats = summarize(args.log)
+    if not stats:
+        parser.error(f"no timings in {args.log}")
+    print(f"{'stage':<16} {'count':>7} {'p50 ms':>10} {'p95 ms':>10}")
+    for stage, s in sorted(stats.items(), key=lambda kv: -kv[1]["p95_ms"]):
+        print(f"{stage:<16} {s['count']:>7} {s['p50_ms']:>10.2f} {s['p95_ms']:>10.2f}")
+    return 0
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    return args.func(args, parser)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+"""Daily-resolution season lengths.
+
+Monthly means flip a whole month when they straddle a threshold. With daily
+temperatures (`D1..D365`, or long-format `Date,Temp` rows that
+`long_to_daily()` averages onto a 365-day year) every day is classified with
+the same rules as a month: Winter if <= winter, Summer if >= summer, otherwise
+Spring while warming and Autumn while cooling (Dec 31 -> Jan 1 wraps), flat
+days split evenly. Lengths are counted in days and reported as fractional
+months of 365/12 days.
+
+A daily matrix is 30x the monthly one, so it is kept as float32 and processed
+in row chunks: the temporary masks never exceed CHUNK_ROWS×365 whatever the
+dataset size.
+"""
+
+import numpy as np
+
+from .scoring import MAX_SCORE
+from .seasons import AUTUMN, SPRING, SUMMER, UNCLASSIFIED, WINTER, season_codes
+
+DAY_COLS = [f"D{i}" for i in range(1, 366)]
+DAYS_PER_MONTH = 365 / 12
+MAX_DAY_SCORE = int(round(MAX_SCORE * DAYS_PER_MONTH))  # distances are in days
+
+MONTH_DAYS = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+MONTH_STARTS = np.concatenate(([0], np.cumsum(MONTH_DAYS)[:-1]))
+
+CHUNK_ROWS = 4096  # ~6 MiB of float32 per chunk
+
+
+def _chunks(n, rows):
+    for start in range(0, n, rows):
+        yield start, min(n, start + rows)
+
+
+def _take(D_c, rows, a, b):
+    """Rows a:b of D_c, or of D_c[rows]; only the chunk is ever gathered."""
+    return D_c[a:b] if rows is None else D_c[rows[a:b]]
+
+
+def day_lengths(D_c, winter_c, summer_c, chunk_rows=CHUNK_ROWS, rows=None):
+    """(winter, spring, summer, autumn) day counts per row, as one 4×N int16 block.
+
+    With `rows` (positions in D_c) only those rows are classified, in order.
+    """
+    n = len(D_c) if rows is None else len(rows)
+    out = np.zeros((4, n), dtype=np.int16)
+    for a, b in _chunks(n, chunk_rows):
+        codes = season_codes(np.asarray(_take(D_c, rows, a, b), dtype=np.float32), winter_c, summer_c)
+        for i, code in enumerate((WINTER, SPRING, SUMMER, AUTUMN)):
+            out[i, a:b] = (codes == code).sum(axis=1, dtype=np.int16)
+    return out
+
+
+def day_distance(lengths, prefs):
+    """Like scoring.distance, for N×4 day counts against month preferences.
+
+    The result is in days, rounded to int16 (0..MAX_DAY_SCORE).
+    """
+    lengths = np.asarray(lengths, dtype=np.float32)
+    pref_days = np.asarray(prefs, dtype=np.float32) * np.float32(DAYS_PER_MONTH)
+    return np.rint(np.abs(lengths - pref_days).sum(axis=-1)).astype(np.int16)
+
+
+def monthly_means(D_c, chunk_rows=CHUNK_ROWS):
+    """N×12 calendar-month means of a daily matrix, ignoring missing days."""
+    n = len(D_c)
+    out = np.full((n, 12), np.nan)
+    for a, b in _chunks(n, chunk_rows):
+        D = np.asarray(D_c[a:b], dtype=np.float32)
+        valid = ~np.isnan(D)
+        sums = np.add.reduceat(np.where(valid, D, 0).astype(float), MONTH_STARTS, axis=1)
+        counts = np.add.reduceat(valid, MONTH_STARTS, axis=1, dtype=np.int16)
+        np.divide(sums, counts, out=out[a:b], where=counts > 0)
+    return out
+
+
+def month_season_days(D_c, winter_c, summer_c):
+    """N×12×4 int16: days of each season (W, Sp, Su, Au) within each calendar month."""
+    D = np.asarray(D_c, dtype=np.float32)
+    codes = season_codes(D, winter_c, summer_c)
+    out = np.empty((len(D), 12, 4), dtype=np.int16)
+    for i, code in enumerate((WINTER, SPRING, SUMMER, AUTUMN)):
+        out[:, :, i] = np.add.reduceat(codes == code, MONTH_STARTS, axis=1, dtype=np.int16)
+    return out
+
+
+def month_codes(D_c, winter_c, summer_c, chunk_rows=CHUNK_ROWS, rows=None):
+    """N×12 int8 season code per calendar month: the season most of its days are in.
+
+    Ties go to the earlier season in W, Sp, Su, Au order; months with no
+    classified day are UNCLASSIFIED. `rows` works as in day_lengths().
+    """
+    n = len(D_c) if rows is None else len(rows)
+    out = np.empty((n, 12), dtype=np.int8)
+    for a, b in _chunks(n, chunk_rows):
+        days = month_season_days(_take(D_c, rows, a, b), winter_c, summer_c)
+        codes = days.argmax(axis=2).astype(np.int8)
+        codes[days.sum(axis=2) == 0] = UNCLASSIFIED
+        out[a:b] = codes
+    return out
+
+
+# A UTC offset ("Z", "+02", "-05:30") after the time of an ISO 8601 timestamp
+UTC_OFFSET = r"(\d:\d\d(?::\d\d(?:[.,]\d+)?)?)\s*(?:Z|[+-]\d\d(?::?\d\d)?)$"
+
+
+def parse_times(values):
+    """ISO 8601 timestamps -> naive datetime Series of local times; NaT if unparseable.
+
+    Rows may use different layouts ("2020-01-06" next to "2020-01-05 01:00"):
+    plain `pd.to_datetime` takes its format from the first value and turns
+    every other layout into NaT. UTC offsets are dropped, not applied, so a
+    reading keeps the calendar day and month of the place it was taken.
+    """
+    import warnings
+
+    import pandas as pd
+
+    values = pd.Series(values, copy=False)
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", FutureWarning)  # mixed offsets
+            times = pd.to_datetime(values, errors="coerce", format="ISO8601")
+    except ValueError:  # mixed offsets, in pandas versions that refuse them
+        times = None
+    if times is not None and isinstance(times.dtype, pd.DatetimeTZDtype):
+        return times.dt.tz_localize(None)
+    if times is None or times.dtype == object:
+        # Offsets differ between rows: strip them and parse the local times
+        local = values.astype("string").str.replace(UTC_OFFSET, r"\1", regex=True)
+        times = pd.to_datetime(local, errors="coerce", format="ISO8601")
+    return times
+
+
+def day_of_year(dates):
+    """Day 1..365 of a 365-day year for a datetime Series, as float.
+
+    Feb 29 and unparseable dates are NaN; later days in leap years shift back
+    one so they line up with other years.
+    """
+    doy = dates.dt.dayofyear.to_numpy(dtype=float, na_value=np.nan)
+    leap = dates.dt.is_leap_year.to_numpy(dtype=bool, na_value=False)
+    doy[leap & (doy == 60)] = np.nan
+    doy -= leap & (doy > 60)
+    return doy
+
+
+def is_long_daily(columns, date_col="Date", temp_col="Temp"):
+    return date_col in columns and temp_col in columns
+
+
+def long_to_daily(df, date_col="Date", temp_col="Temp"):
+    """Long-format (City, Country, Date, Temp) rows -> one D1..D365 row per place.
+
+    Observations are averaged per day of a 365-day year (all years pooled);
+    Feb 29 is dropped so later days line up across leap years. Places keep the
+    order they first appear in; days without data are NaN.
+    """
+    import pandas as pd
+
+    keys = [c for c in ("City", "Country") if c in df.columns]
+    if not keys:
+        raise ValueError("Long-format daily data needs a City column")
+    day = day_of_year(parse_times(df[date_col]))
+    keep = ~np.isnan(day)
+
+    long = df.loc[keep, keys].copy()
+    long["_day"] = day[keep].astype(np.int16)
+    long["_temp"] = pd.to_numeric(df.loc[keep, temp_col], errors="coerce").astype(np.float32)
+    wide = long.groupby([*keys, "_day"], sort=False)["_temp"].mean().unstack("_day")
+    first = long[keys].drop_duplicates()
+    places = pd.MultiIndex.from_frame(first) if len(keys) > 1 else pd.Index(first[keys[0]])
+    wide = wide.reindex(index=places, columns=range(1, 366)).astype(np.float32)
+    wide.columns = DAY_COLS
+    return wide.reset_index()
@@ -0,0 +1,428 @@
+"""Dataset loading: parse each CSV once and reuse it across reruns.
+
+Parsed frames are cached process-wide, keyed on a cheap fingerprint of the
+source: path + size + mtime for files on disk, size + a streaming hash of the
+bytes for uploads. Editing the file or uploading different bytes gives a new
+key, so stale frames are never served.
+
+Each cached entry is a `Dataset`: the frame plus its read-only °C matrix
+`T` (and, for daily data, the float32 day matrix `daily`). Sessions share these objects and only allocate their own results, so
+40 users on the built-in file hold one copy of it between them.
+
+pandas is only imported when a frame is actually parsed, so headless callers
+(the CLI, services) that read with `read_temps_csv` never pay for it.
+"""
+
+import csv
+import hashlib
+import os
+
+import numpy as np
+
+from .cache import ByteLRU
+from .daily import DAY_COLS, day_lengths, is_long_daily, long_to_daily, monthly_means
+from .geo import GridIndex, coordinate_columns
+from .search import TrigramIndex
+from .seasons import SeasonIndex, season_masks
+
+HASH_CHUNK = 1 << 20  # 1 MiB
+
+TEMP_COLS = [f"T{i}" for i in range(1, 13)]
+
+# Text columns with at most this many distinct values become facets
+FACET_MAX_VALUES = 1000
+NAME_COLS = ("City", "Station")  # per-place names, never facets
+
+# Budget for parsed datasets, shared by every session in this process. A
+# 2M-row file with all its indexes takes over 1 GiB; one bigger than the
+# budget is still kept (alone) and flagged in the sidebar
+CACHE_MB = int(os.environ.get("SEASONFINDER_CACHE_MB", "2048"))
+DATASETS = ByteLRU(CACHE_MB * 1024 * 1024)
+
+# Season lengths per (dataset, winter, summer): 4 bytes per city per entry, so
+# users dragging the sliders back and forth hit a dictionary lookup
+LENGTHS_MB = int(os.environ.get("SEASONFINDER_LENGTHS_MB", "128"))
+LENGTHS = ByteLRU(LENGTHS_MB * 1024 * 1024)
+
+
+def fingerprint_path(path):
+    st = os.stat(path)
+    return ("path", os.path.abspath(path), st.st_size, st.st_mtime_ns)
+
+
+def fingerprint_upload(fileobj):
+    """Hash an uploaded file in chunks without keeping a second copy around."""
+    h = hashlib.blake2b(digest_size=16)
+    size = 0
+    fileobj.seek(0)
+    while True:
+        chunk = fileobj.read(HASH_CHUNK)
+        if not chunk:
+            break
+        h.update(chunk)
+        size += len(chunk)
+    fileobj.seek(0)
+    return ("upload", size, h.hexdigest())
+
+
+def fingerprint(source):
+    if isinstance(source, (str, os.PathLike)):
+        return fingerprint_path(source)
+    return fingerprint_upload(source)
+
+
+def frame_nbytes(df):
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def nbytes(obj):
+    """Best-effort size of a frame, series or array, in bytes."""
+    if hasattr(obj, "memory_usage"):  # DataFrame / Series
+        return int(np.sum(obj.memory_usage(index=True, deep=True)))
+    return int(getattr(obj, "nbytes", 0))
+
+
+class KeyIndex:
+    """Row positions grouped by key, for constant-time "which rows are X?".
+
+    Keys are factorized once; rows sharing a key sit contiguously in `order`
+    (in dataset order), so a lookup is a hash probe plus a slice.
+    """
+
+    def __init__(self, keys):
+        import pandas as pd
+
+        codes, uniques = pd.factorize(keys)
+        self.codes = codes
+        self.uniques = pd.Index(uniques)
+        # Missing keys (code -1) sort first; they belong to no key
+        self.order = np.argsort(codes, kind="stable")[np.count_nonzero(codes < 0):]
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        self.starts = np.concatenate(([0], np.cumsum(counts)))
+        for a in (self.codes, self.order, self.starts):
+            a.setflags(write=False)  # shared with every session using the dataset
+
+    def __len__(self):
+        return len(self.uniques)
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes + self.order.nbytes + self.starts.nbytes + int(self.uniques.memory_usage(deep=True))
+
+    def counts(self):
+        return np.diff(self.starts)
+
+    def rows_for_code(self, code):
+        return self.order[self.starts[code]:self.starts[code + 1]]
+
+    def rows(self, key):
+        try:
+            code = self.uniques.get_loc(key)
+        except KeyError:
+            return self.order[:0]
+        return self.rows_for_code(code)
+
+    def rows_any(self, keys):
+        """Sorted row positions having any of `keys`."""
+        parts = [self.rows(k) for k in keys]
+        if len(parts) == 1:
+            return parts[0]
+        return np.sort(np.concatenate(parts)) if parts else self.order[:0]
+
+    def value_counts(self, rows=None):
+        """Rows per key (aligned with `uniques`), optionally only among `rows`."""
+        if rows is None:
+            return self.counts()
+        codes = self.codes[rows]
+        return np.bincount(codes[codes >= 0], minlength=len(self.uniques))
+
+
+def intersect_rows(row_sets):
+    """Sorted rows present in every array of `row_sets` (None means all rows)."""
+    sets = sorted((r for r in row_sets if r is not None), key=len)
+    if not sets:
+        return None
+    out = sets[0]
+    for rows in sets[1:]:
+        # Binary-search the (smallest) survivors in each larger sorted list
+        at = np.searchsorted(rows, out)
+        hit = at < len(rows)
+        hit[hit] = rows[at[hit]] == out[hit]
+        out = out[hit]
+    return out
+
+
+class Dataset:
+    """A parsed CSV plus the temperature matrix derived from it.
+
+    Shared between sessions: neither `df` nor `T` may be modified. `T` is
+    flagged read-only so an accidental in-place write fails loudly. The
+    threshold-independent `season_index` is built here too, so it is cached
+    (and evicted) together with the data it describes.
+
+    Daily uploads (D1..D365) keep their days in `daily` (float32, N×365) and
+    drop them from `df`; `T` then holds calendar-month means unless the CSV
+    has its own T1..T12.
+
+    If the CSV has Lat/Lon columns, `geo` is a GridIndex over them (else None).
+    Low-cardinality text columns (Country, ...) are stored as categoricals and
+    get a KeyIndex each in `facets`; `filter_rows()` combines a location and
+    facet selections into sorted row ids.
+
+    A row's id is its position in `df` (and in `T` and every result array);
+    positional lookups are O(1). `rows_for()` maps a City/Country name back to
+    row ids; names are not unique (Portland, USA is two places). `search` is a
+    TrigramIndex over "City Country" for fuzzy lookups by name.
+    """
+
+    def __init__(self, df, key):
+        import pandas as pd
+
+        # Row ids are positions; make the frame's own index agree
+        if not df.index.equals(pd.RangeIndex(len(df))):
+            df = df.reset_index(drop=True)
+        self.daily = None
+        if all(c in df.columns for c in DAY_COLS):
+            self.daily = np.ascontiguousarray(df[DAY_COLS].to_numpy(dtype=np.float32))
+            self.daily.setflags(write=False)
+            df = df.drop(columns=DAY_COLS)  # the float32 copy is the only one
+        self.facets = self._facet_indexes(df)
+        if self.facets:
+            # The codes double as a categorical column: one small int per row
+            df = df.assign(**{
+                col: pd.Categorical.from_codes(index.codes, index.uniques) for col, index in self.facets.items()
+            })
+        self.df = df
+        self.key = key
+        self.names = KeyIndex(self._name_keys(df)) if "City" in df.columns else None
+        self.search = TrigramIndex(self._name_keys(df, sep=" ")) if "City" in df.columns else None
+        coords = coordinate_columns(df.columns)
+        self.geo = None
+        if coords is not None:
+            lat, lon = (pd.to_numeric(df[c], errors="coerce").to_numpy(dtype=float) for c in coords)
+            self.geo = GridIndex(lat, lon)
+        self.missing = [c for c in TEMP_COLS if c not in df.columns]
+        if self.missing and self.daily is not None:
+            self.missing = []
+            self.T = monthly_means(self.daily)
+        elif self.missing:
+            self.T = None
+        else:
+            self.T = np.ascontiguousarray(df[TEMP_COLS].to_numpy(dtype=float))
+        if self.T is None:
+            self.season_index = None
+        else:
+            self.T.setflags(write=False)
+            self.season_index = SeasonIndex(self.T)  # T is already °C
+
+    def __len__(self):
+        return len(self.df)
+
+    @staticmethod
+    def _name_keys(df, sep="\x1f"):
+        city = df["City"].astype(str)
+        if "Country" not in df.columns:
+            return city.to_numpy()
+        return (city + sep + df["Country"].astype(str)).to_numpy()
+
+    @staticmethod
+    def _facet_indexes(df):
+        import pandas as pd
+
+        coords = coordinate_columns(df.columns) or ()
+        facets = {}
+        for col in df.columns:
+            if col in NAME_COLS or col in coords or col in TEMP_COLS:
+                continue
+            dtype = df[col].dtype
+            if not (pd.api.types.is_object_dtype(dtype) or isinstance(dtype, pd.CategoricalDtype)):
+                continue
+            index = KeyIndex(df[col].to_numpy())
+            if len(index) <= FACET_MAX_VALUES:
+                facets[col] = index
+        return facets
+
+    def facet_rows(self, selection):
+        """Sorted rows matching every (column, values) pair; None if nothing is selected."""
+        return intersect_rows([self.facets[col].rows_any(values) for col, values in selection if values])
+
+    def region_rows(self, region):
+        """Sorted rows inside ("radius", lat, lon, km) or ("bbox", s, n, w, e); None for no region."""
+        if region is None:
+            return None
+        if self.geo is None:
+            raise ValueError("This dataset has no Lat/Lon columns to filter on")
+        kind, *args = region
+        if kind == "radius":
+            return self.geo.radius(*args)[0]
+        if kind == "bbox":
+            return self.geo.bbox(*args)
+        raise ValueError(f"unknown region {kind!r}")
+
+    def filter_rows(self, region=None, facets=()):
+        """Rows passing the location and every facet filter, or None for all rows."""
+        return intersect_rows([self.region_rows(region), self.facet_rows(facets)])
+
+    def rows_for(self, city, country=None):
+        """Row ids of every row called `city` (in `country`, if the CSV has one)."""
+        if self.names is None:
+            return np.empty(0, dtype=np.intp)
+        key = str(city) if "Country" not in self.df.columns else f"{city}\x1f{country}"
+        return self.names.rows(key)
+
+    @property
+    def nbytes(self):
+        total = frame_nbytes(self.df)
+        if self.names is not None:
+            total += self.names.nbytes + self.search.nbytes
+        total += sum(index.nbytes for index in self.facets.values())
+        if self.T is not None:
+            total += self.T.nbytes + self.season_index.nbytes
+        if self.daily is not None:
+            total += self.daily.nbytes
+        if self.geo is not None:
+            total += self.geo.nbytes
+        return total
+
+
+def load_dataset(source, pinned=False):
+    """Return the shared `Dataset` for a path or file-like upload.
+
+    Pass `pinned=True` for the built-in file so it is never evicted; otherwise
+    a session still holding the old object plus a fresh reparse would mean two
+    copies in memory. Long-format daily files (Date, Temp columns) are
+    averaged into D1..D365 rows on the way in.
+    """
+    key = fingerprint(source)
+
+    def parse():
+        import pandas as pd
+
+        if not isinstance(source, (str, os.PathLike)):
+            source.seek(0)
+        # Day columns are parsed straight to float32 (ignored if absent)
+        df = pd.read_csv(source, dtype=dict.fromkeys(DAY_COLS, np.float32))
+        if is_long_daily(df.columns):
+            df = long_to_daily(df)
+        return Dataset(df, key)
+
+    return DATASETS.get_or_create(key, parse, lambda ds: ds.nbytes, pinned=pinned)
+
+
+def read_temps_csv(path, label_cols=("City", "Country")):
+    """Read label columns and T1..T12 with the stdlib csv module (no pandas).
+
+    Returns (labels, T) where labels maps each label column to a list of
+    strings and T is an N×12 float array (blank cells become NaN).
+    """
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        missing = [c for c in TEMP_COLS if c not in header]
+        if missing:
+            raise ValueError(f"Missing columns in CSV: {missing}")
+        temp_idx = [header.index(c) for c in TEMP_COLS]
+        label_idx = {c: header.index(c) for c in label_cols if c in header}
+        labels = {c: [] for c in label_idx}
+        temps = []
+        for row in reader:
+            if not row:
+                continue
+            for c, i in label_idx.items():
+                labels[c].append(row[i])
+            temps.append([row[i] or "nan" for i in temp_idx])
+    T = np.array(temps, dtype=float).reshape(len(temps), 12)
+    return labels, T
+
+
+def cached_lengths(dataset, winter_c, summer_c):
+    """(winter, spring, summer, autumn) int8 arrays, shared across sessions.
+
+    Stored as one compact 4×N int8 block; the returned arrays are read-only
+    views into it.
+    """
+
+    def build():
+        block = np.stack(dataset.season_index.lengths(winter_c, summer_c)).astype(np.int8, copy=False)
+        block.setflags(write=False)
+        return block
+
+    block = LENGTHS.get_or_create((dataset.key, float(winter_c), float(summer_c)), build, lambda b: b.nbytes)
+    return tuple(block)
+
+
+def cached_masks(dataset, winter_c, summer_c):
+    """(winter, spring, summer, autumn) uint16 month masks, shared like cached_lengths()."""
+
+    def build():
+        block = np.stack(season_masks(dataset.T, winter_c, summer_c))
+        block.setflags(write=False)
+        return block
+
+    key = (dataset.key, "masks", float(winter_c), float(summer_c))
+    return tuple(LENGTHS.get_or_create(key, build, lambda b: b.nbytes))
+
+
+def cached_day_lengths(dataset, winter_c, summer_c):
+    """Daily counterpart of cached_lengths(): int16 day counts from `dataset.daily`."""
+
+    def build():
+        block = day_lengths(dataset.daily, winter_c, summer_c)
+        block.setflags(write=False)
+        return block
+
+    key = (dataset.key, "daily", float(winter_c), float(summer_c))
+    return tuple(LENGTHS.get_or_create(key, build, lambda b: b.nbytes))
+
+
+def cache_stats():
+    return DATASETS.stats()
+
+
+def lengths_cache_stats():
+    return LENGTHS.stats()
+
+
+def _private_buffers(obj, seen):
+    """Bytes of the arrays reachable from `obj` that this session owns.
+
+    Arrays are reduced to the buffer they view, and each buffer is counted
+    once. Read-only arrays and views are shared (cached blocks, dataset
+    matrices and indexes are all flagged read-only) and count nothing.
+    """
+    if hasattr(obj, "memory_usage"):  # DataFrame / Series: always a private copy
+        return nbytes(obj) if seen.setdefault(id(obj), obj) is obj else 0
+    if isinstance(obj, np.ndarray):
+        shared = not obj.flags.writeable
+        while isinstance(obj.base, np.ndarray):
+            obj = obj.base
+            shared = shared or not obj.flags.writeable
+        if shared or id(obj) in seen:
+            return 0
+        seen[id(obj)] = obj
+        return obj.nbytes
+    if isinstance(obj, dict):
+        return sum(_private_buffers(v, seen) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(_private_buffers(v, seen) for v in obj)
+    if hasattr(obj, "__dict__"):
+        return _private_buffers(vars(obj), seen)
+    return 0
+
+
+def memory_report(**session_objects):
+    """Shared (process-wide) versus per-session footprint, in bytes.
+
+    Shared is both caches: parsed datasets and the season-length/mask blocks.
+    `session_objects` are what this session's stages returned (results,
+    buckets, frames, ...); only arrays they own count, not views into a
+    shared block, and an array two objects hold counts once.
+    """
+    seen = {}
+    per_session = {name: _private_buffers(obj, seen) for name, obj in session_objects.items()}
+    return {
+        "shared": DATASETS.bytes + LENGTHS.bytes,
+        "shared_detail": {"datasets": DATASETS.bytes, "season lengths": LENGTHS.bytes},
+        "per_session": sum(per_session.values()),
+        "per_session_detail": per_session,
+    }
@@ -0,0 +1,119 @@
+"""Spatial filtering over optional Lat/Lon columns.
+
+`GridIndex` hashes every point into a fixed lat/lon grid (1° cells by default)
+and stores the rows cell by cell, CSR style like data.KeyIndex. Cells in one
+latitude band with consecutive longitudes are consecutive in the layout, so a
+bounding box is one slice per band; the boundary cells are then checked
+exactly. A radius query takes the circle's bounding box and filters the
+candidates by great-circle distance. Building is one stable argsort; queries
+touch only the cells they overlap, so millions of points answer in
+milliseconds.
+
+    index = GridIndex(df["Lat"], df["Lon"])
+    rows, km = index.radius(39.74, -104.99, 500)   # rows sorted by dataset order
+    rows = index.bbox(south=35, north=45, west=-110, east=-95)
+
+Rows without valid coordinates are never returned.
+"""
+
+import numpy as np
+
+EARTH_KM = 6371.0088
+LAT_NAMES = ("Lat", "Latitude", "lat", "latitude")
+LON_NAMES = ("Lon", "Lng", "Long", "Longitude", "lon", "lng", "longitude")
+
+
+def coordinate_columns(columns):
+    """(lat_col, lon_col) found in `columns`, or None."""
+    lat = next((c for c in LAT_NAMES if c in columns), None)
+    lon = next((c for c in LON_NAMES if c in columns), None)
+    return (lat, lon) if lat and lon else None
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(a, dtype=float)) for a in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class GridIndex:
+    def __init__(self, lat, lon, cell_deg=1.0):
+        self.lat = np.asarray(lat, dtype=float)
+        self.lon = np.asarray(lon, dtype=float)
+        self.cell_deg = float(cell_deg)
+        self.n_rows = int(np.ceil(180 / self.cell_deg))
+        self.n_cols = int(np.ceil(360 / self.cell_deg))
+        ok = np.isfinite(self.lat) & np.isfinite(self.lon) & (np.abs(self.lat) <= 90)
+        rows = np.flatnonzero(ok)
+        cells = self._band(self.lat[rows]) * self.n_cols + self._col(self.lon[rows])
+        order = np.argsort(cells, kind="stable")
+        self.order = rows[order]  # dataset rows, cell by cell (dataset order inside a cell)
+        counts = np.bincount(cells, minlength=self.n_rows * self.n_cols)
+        self.starts = np.concatenate(([0], np.cumsum(counts)))
+        self.n_valid = len(rows)
+
+    def __len__(self):
+        return self.n_valid
+
+    @property
+    def nbytes(self):
+        return self.lat.nbytes + self.lon.nbytes + self.order.nbytes + self.starts.nbytes
+
+    def _band(self, lat):
+        return np.clip(((np.asarray(lat) + 90) // self.cell_deg).astype(np.int64), 0, self.n_rows - 1)
+
+    def _col(self, lon):
+        lon = (np.asarray(lon) + 180) % 360  # wrap to [0, 360)
+        return np.clip((lon // self.cell_deg).astype(np.int64), 0, self.n_cols - 1)
+
+    def _candidates(self, south, north, west, east):
+        """Rows in every cell the box overlaps (a superset of the answer)."""
+        b0, b1 = int(self._band(south)), int(self._band(north))
+        if east - west >= 360:
+            spans = [(0, self.n_cols - 1)]
+        else:
+            c0, c1 = int(self._col(west)), int(self._col(east))
+            # Going east from `west`, a box crossing the antimeridian wraps
+            # round to column 0 (and may come back to c0's own column)
+            if (west + 180) % 360 + (east - west) % 360 < 360:
+                spans = [(c0, c1)]
+            elif c0 > c1:
+                spans = [(c0, self.n_cols - 1), (0, c1)]
+            else:
+                spans = [(0, self.n_cols - 1)]
+        parts = []
+        for band in range(b0, b1 + 1):
+            base = band * self.n_cols
+            for c0, c1 in spans:
+                parts.append(self.order[self.starts[base + c0]:self.starts[base + c1 + 1]])
+        return np.concatenate(parts) if parts else self.order[:0]
+
+    def bbox(self, south, north, west, east):
+        """Sorted rows with south <= lat <= north and lon in [west, east] (may wrap)."""
+        if south > north:
+            return self.order[:0]
+        cand = self._candidates(south, north, west, east)
+        lat, lon = self.lat[cand], self.lon[cand]
+        inside = (lat >= south) & (lat <= north)
+        if east - west < 360:
+            # longitudes measured eastwards from the west edge
+            span = (east - west) % 360
+            inside &= (lon - west) % 360 <= span
+        return np.sort(cand[inside])
+
+    def radius(self, lat, lon, km):
+        """(rows, distances_km) within `km` of the point, rows in dataset order."""
+        dlat = np.degrees(km / EARTH_KM)
+        south, north = lat - dlat, lat + dlat
+        if north >= 90 or south <= -90:
+            west, east = -180.0, 180.0  # the circle covers a pole
+        else:
+            # widest point of the circle in longitude (at its own latitude)
+            dlon = np.degrees(np.arcsin(min(1.0, np.sin(km / EARTH_KM) / np.cos(np.radians(lat)))))
+            west, east = (-180.0, 180.0) if dlon >= 180 else (lon - dlon, lon + dlon)
+        cand = self._candidates(max(south, -90), min(north, 90), west, east)
+        dist = haversine_km(lat, lon, self.lat[cand], self.lon[cand])
+        keep = dist <= km
+        rows, dist = cand[keep], dist[keep]
+        order = np.argsort(rows)
+        return rows[order], dist[order]
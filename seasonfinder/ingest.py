@@ -0,0 +1,181 @@
+"""Streaming aggregation of raw station observations into climate normals.
+
+    python -m seasonfinder ingest obs_2019.csv obs_2020.csv -o cities.csv \\
+        --stations stations.csv
+
+Observation files are long format, one reading per row (station, timestamp,
+temp), hourly or daily or anything else. They are read in chunks; each chunk
+is reduced with one `np.bincount` into per-station running sums and counts,
+then dropped. Memory is one chunk plus 12 (or 365) sums and counts per
+station, however many rows the files hold.
+
+The result is the City,Country,T1..T12 frame app.py reads (D1..D365 with
+`daily=True`), keeping a Station column as well: the mean of every reading in
+that calendar month (or day of the year), pooled over all years. Station
+names come from City/Country columns in the observations, a separate stations
+file, or else the station id.
+"""
+
+import numpy as np
+
+from .daily import DAY_COLS, day_of_year, parse_times
+from .data import TEMP_COLS
+
+CHUNK_ROWS = 500_000
+
+
+class NormalsAccumulator:
+    """Running per-station sums and counts by month (or day of year)."""
+
+    def __init__(self, daily=False):
+        self.bins = 365 if daily else 12
+        self.ids = {}  # station -> row
+        self.labels = []  # (city, country) per row, None if unknown
+        self.sums = np.zeros((0, self.bins))
+        self.counts = np.zeros((0, self.bins), dtype=np.int64)
+        self.rows_read = 0
+        self.rows_used = 0
+        self.rows_bad_time = 0  # dropped for a missing or unparseable timestamp
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _grow(self, n):
+        cap = len(self.sums)
+        if n <= cap:
+            return
+        cap = max(n, 2 * cap, 64)
+        sums = np.zeros((cap, self.bins))
+        counts = np.zeros((cap, self.bins), dtype=np.int64)
+        sums[: len(self.sums)] = self.sums
+        counts[: len(self.counts)] = self.counts
+        self.sums, self.counts = sums, counts
+
+    def _station_rows(self, stations, labels=None):
+        import pandas as pd
+
+        codes, uniques = pd.factorize(stations)
+        known = len(self.ids)
+        rows = np.fromiter(
+            (self.ids.setdefault(s, len(self.ids)) for s in uniques), dtype=np.intp, count=len(uniques)
+        )
+        new = rows >= known
+        if new.any():
+            self._grow(len(self.ids))
+            # uniques are in first-appearance order, so these are the first rows
+            first = np.unique(codes[codes >= 0], return_index=True)[1]
+            for u in np.flatnonzero(new):
+                self.labels.append(None if labels is None else tuple(labels[first[u]]))
+        return np.where(codes >= 0, rows[codes], -1)
+
+    def add(self, stations, bins, temps, labels=None):
+        """Fold one chunk in. `bins` are 0-based month (or day) numbers, NaN if unusable.
+
+        `labels` is an optional N×2 (City, Country) array for the same rows;
+        the first one seen for a station is kept.
+        """
+        temps = np.asarray(temps, dtype=float)
+        bins = np.asarray(bins, dtype=float)
+        self.rows_read += len(temps)
+        rows = self._station_rows(stations, labels)
+        ok = (rows >= 0) & ~np.isnan(bins) & ~np.isnan(temps)
+        flat = rows[ok] * self.bins + bins[ok].astype(np.intp)
+        size = len(self.ids) * self.bins
+        self.sums.reshape(-1)[:size] += np.bincount(flat, weights=temps[ok], minlength=size)
+        self.counts.reshape(-1)[:size] += np.bincount(flat, minlength=size)
+        self.rows_used += int(ok.sum())
+
+    def add_frame(self, chunk, station_col, time_col, temp_col, fahrenheit=False):
+        import pandas as pd
+
+        times = parse_times(chunk[time_col])
+        self.rows_bad_time += int(times.isna().sum())
+        if self.bins == 12:
+            bins = times.dt.month.to_numpy(dtype=float, na_value=np.nan) - 1
+        else:
+            bins = day_of_year(times) - 1
+        temps = pd.to_numeric(chunk[temp_col], errors="coerce").to_numpy(dtype=float)
+        if fahrenheit:
+            temps = (temps - 32) * 5 / 9
+        labels = None
+        if "City" in chunk.columns:
+            country = chunk["Country"] if "Country" in chunk.columns else pd.Series("", index=chunk.index)
+            labels = np.column_stack([chunk["City"].astype(str), country.astype(str)])
+        self.add(chunk[station_col].astype(str).to_numpy(), bins, temps, labels)
+
+    def normals(self, min_count=1):
+        """Station × bin means in °C; NaN where fewer than `min_count` readings."""
+        n = len(self.ids)
+        counts = self.counts[:n]
+        out = np.full((n, self.bins), np.nan)
+        np.divide(self.sums[:n], counts, out=out, where=counts >= max(min_count, 1))
+        return out
+
+    def to_frame(self, min_count=1, stations=None):
+        """City, Country, Station, T1..T12 (or D1..D365), one row per station.
+
+        `stations` is an optional {station: (city, country)} mapping; it wins
+        over names found in the observations.
+        """
+        import pandas as pd
+
+        ids = list(self.ids)
+        names = [
+            (stations or {}).get(s) or self.labels[i] or (s, "")
+            for i, s in enumerate(ids)
+        ]
+        cols = TEMP_COLS if self.bins == 12 else DAY_COLS
+        df = pd.DataFrame(self.normals(min_count).round(2), columns=cols)
+        df.insert(0, "Station", ids)
+        df.insert(0, "Country", [c for _, c in names])
+        df.insert(0, "City", [c for c, _ in names])
+        return df
+
+
+def read_stations(path, station_col="station"):
+    """{station: (city, country)} from a CSV with station, City and Country columns."""
+    import pandas as pd
+
+    df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    missing = [c for c in (station_col, "City") if c not in df.columns]
+    if missing:
+        raise ValueError(f"Missing columns in stations CSV: {missing}")
+    country = df["Country"] if "Country" in df.columns else [""] * len(df)
+    return {s: (c, k) for s, c, k in zip(df[station_col], df["City"], country)}
+
+
+def aggregate_observations(
+    paths,
+    station_col="station",
+    time_col="timestamp",
+    temp_col="temp",
+    chunksize=CHUNK_ROWS,
+    daily=False,
+    fahrenheit=False,
+    min_count=1,
+    stations=None,
+    progress=None,
+):
+    """Stream observation CSVs into a City,Country,Station,T1..T12 frame.
+
+    `progress(acc)` is called after every chunk, if given; `acc.rows_read`
+    and `acc.rows_used` tell how many readings were dropped.
+    """
+    import pandas as pd
+
+    if isinstance(paths, str):
+        paths = [paths]
+    acc = NormalsAccumulator(daily=daily)
+    wanted = {station_col, time_col, temp_col, "City", "Country"}
+    for path in paths:
+        header = pd.read_csv(path, nrows=0).columns
+        missing = [c for c in (station_col, time_col, temp_col) if c not in header]
+        if missing:
+            raise ValueError(f"Missing columns in {path}: {missing}")
+        usecols = [c for c in header if c in wanted]
+        dtypes = {c: str for c in usecols if c != temp_col}
+        for chunk in pd.read_csv(path, usecols=usecols, dtype=dtypes, chunksize=chunksize):
+            acc.add_frame(chunk, station_col, time_col, temp_col, fahrenheit)
+            if progress is not None:
+                progress(acc)
+    return acc.to_frame(min_count, stations)
@@ -0,0 +1,94 @@
+"""Multi-core scoring over a temperature matrix in shared memory.
+
+For gridded datasets with tens of millions of rows, one NumPy thread is the
+bottleneck. `ShardedScorer` copies T once into a `multiprocessing`
+shared-memory block; worker processes attach to it and read their row range
+as a zero-copy view, so nothing but a few scalars goes through pickle. Each
+shard returns its own top K; the partial results are merged at the end with
+the usual tie-break (lower distance, then lower row).
+
+    with ShardedScorer(T_c, workers=8) as scorer:
+        rows, dist = scorer.top_k(5.0, 20.0, (5, 2, 3, 2), k=20)
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .ranking import top_k as _top_k
+from .scoring import MAX_SCORE, distance
+from .seasons import season_lengths
+
+# Per-worker view of the shared matrix, set by _attach()
+_shm = None
+_T = None
+
+
+def _attach(name, shape, dtype):
+    global _shm, _T
+    _shm = shared_memory.SharedMemory(name=name)
+    _T = np.ndarray(shape, dtype=dtype, buffer=_shm.buf)
+
+
+def _score_shard(start, stop, winter_c, summer_c, prefs, k):
+    lengths = season_lengths(_T[start:stop], winter_c, summer_c)
+    dist = distance(np.stack(lengths, axis=1), prefs)
+    rows, d = _top_k(dist, k)
+    counts = np.bincount(dist, minlength=MAX_SCORE + 1)
+    return rows + start, d, counts
+
+
+def merge_top_k(parts, k):
+    """Merge per-shard (rows, dist) lists into the global top k."""
+    rows = np.concatenate([p[0] for p in parts]) if parts else np.empty(0, dtype=np.intp)
+    dist = np.concatenate([p[1] for p in parts]) if parts else np.empty(0, dtype=np.int16)
+    order = np.lexsort((rows, dist))[:k]
+    return rows[order], dist[order]
+
+
+class ShardedScorer:
+    """Process pool scoring shards of one shared T matrix.
+
+    Keep it open across queries: the pool and shared block are the expensive
+    part. `counts` from the last query is the distance histogram over all rows.
+    """
+
+    def __init__(self, T_c, workers=None, shards_per_worker=2):
+        T_c = np.asarray(T_c, dtype=float)
+        self.n = len(T_c)
+        self.workers = workers or os.cpu_count() or 1
+        self._shm = shared_memory.SharedMemory(create=True, size=max(T_c.nbytes, 1))
+        self.T = np.ndarray(T_c.shape, dtype=T_c.dtype, buffer=self._shm.buf)
+        self.T[:] = T_c
+        n_shards = max(1, min(self.n, self.workers * shards_per_worker))
+        bounds = np.linspace(0, self.n, n_shards + 1).astype(int)
+        self.shards = [(a, b) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_attach,
+            initargs=(self._shm.name, T_c.shape, T_c.dtype),
+        )
+        self.counts = None
+
+    def top_k(self, winter_c, summer_c, prefs, k=20):
+        futures = [
+            self._pool.submit(_score_shard, a, b, winter_c, summer_c, tuple(prefs), k)
+            for a, b in self.shards
+        ]
+        parts = [f.result() for f in futures]
+        self.counts = sum(p[2] for p in parts) if parts else np.zeros(MAX_SCORE + 1, dtype=np.int64)
+        return merge_top_k(parts, k)
+
+    def close(self):
+        self._pool.shutdown()
+        del self.T
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,218 @@
+"""Memoized pipeline stages with explicit inputs.
+
+Each stage names the parameters it reads and the stages it depends on. A
+stage's result is reused until one of its own parameters changes or an
+upstream stage produced a new result, so moving the preference sliders
+doesn't reclassify and switching °F/°C doesn't rescore:
+
+    ingest(dataset) -> candidates(region, facets) -> classify(winter_c, summer_c, daily)
+        -> buckets -> score(prefs) -> rank(k) -> display(unit)
+
+With `daily=True` classify counts days instead of months; there are too many
+day compositions to bucket, so buckets is None and score/rank work on the
+per-city distances directly. A non-zero `contiguity` weight adds a masks
+stage (uint16 month masks per city) and charges that much distance per extra
+season episode; that too is per city, so rank reads the distances directly.
+`sweep` (None, or a (winter_grid, summer_grid) pair of tuples) runs a
+threshold sensitivity sweep around the current #1 (monthly data without a
+contiguity penalty only).
+
+`region` restricts the run to cities near a point, ("radius", lat, lon, km),
+or in a box, ("bbox", south, north, west, east), using the dataset's
+GridIndex; `facets` to rows whose facet columns take one of the chosen
+values, ((column, (value, ...)), ...). The candidates stage turns both into
+sorted dataset rows before anything is classified, so only those rows are
+classified and scored; result positions then index the candidates (see
+Results.row_ids).
+
+`Pipeline.ran` lists the stages that actually executed in the last `run()`;
+pass `recorder=` (an instrument.Recorder) to time them as well.
+"""
+
+import logging
+
+import numpy as np
+
+from .daily import DAYS_PER_MONTH, MAX_DAY_SCORE, day_distance, day_lengths, month_codes
+from .data import cached_day_lengths, cached_lengths, cached_masks
+from .ranking import CountingRanker, top_k
+from .results import Results
+from .scoring import CompositionIndex, contiguous_distance
+from .seasons import SEASON_LABELS, SeasonIndex, season_codes, season_lengths, season_masks
+from .sweep import threshold_sweep
+
+log = logging.getLogger(__name__)
+
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+
+class Stage:
+    def __init__(self, name, fn, params=(), deps=()):
+        self.name = name
+        self.fn = fn
+        self.params = tuple(params)
+        self.deps = tuple(deps)
+
+
+class Pipeline:
+    def __init__(self):
+        self.stages = {}
+        self._memo = {}  # name -> (key, version, value)
+        self._version = 0
+        self._recorder = None
+        self.ran = []
+
+    def add(self, name, fn, params=(), deps=()):
+        """Register `fn(**deps, **params)`; deps must already be registered."""
+        for d in deps:
+            if d not in self.stages:
+                raise ValueError(f"stage {name!r} depends on unknown stage {d!r}")
+        self.stages[name] = Stage(name, fn, params, deps)
+        return self
+
+    def run(self, *targets, recorder=None, **params):
+        """Bring `targets` (default: every stage) up to date; returns {stage: value}."""
+        self.ran = []
+        self._recorder = recorder
+        out = {}
+        try:
+            for name in targets or self.stages:
+                self._ensure(name, params, out)
+        finally:
+            self._recorder = None
+        if self.ran:
+            log.info("stages ran: %s", ", ".join(self.ran))
+        return out
+
+    def _ensure(self, name, params, out):
+        if name in out:
+            return self._memo[name][1]
+        stage = self.stages[name]
+        dep_versions = tuple(self._ensure(d, params, out) for d in stage.deps)
+        try:
+            key = (tuple(params[p] for p in stage.params), dep_versions)
+        except KeyError as e:
+            raise TypeError(f"stage {name!r} needs parameter {e.args[0]!r}") from None
+        memo = self._memo.get(name)
+        if memo is None or memo[0] != key:
+            fn = stage.fn if self._recorder is None else self._recorder.wrap(name, stage.fn)
+            value = fn(
+                **{d: out[d] for d in stage.deps},
+                **{p: params[p] for p in stage.params},
+            )
+            self._version += 1
+            memo = (key, self._version, value)
+            self._memo[name] = memo
+            self.ran.append(name)
+        out[name] = memo[2]
+        return memo[1]
+
+    def invalidate(self, name=None):
+        """Drop memoized results (one stage, or all); dependents follow automatically."""
+        if name is None:
+            self._memo.clear()
+        else:
+            self._memo.pop(name, None)
+
+
+# The app's stages. Each returns plain objects; nothing here touches Streamlit.
+
+def _ingest(dataset):
+    return dataset
+
+
+def _candidates(ingest, region, facets):
+    return ingest.filter_rows(region, facets)
+
+
+def _classify(ingest, candidates, winter_c, summer_c, daily):
+    if candidates is not None:
+        # A filtered subset is classified directly; the LRU holds whole datasets
+        if daily:
+            return tuple(day_lengths(ingest.daily, winter_c, summer_c, rows=candidates))
+        return season_lengths(ingest.T[candidates], winter_c, summer_c)
+    # Process-wide LRU: revisiting a threshold pair is a lookup
+    if daily:
+        return cached_day_lengths(ingest, winter_c, summer_c)
+    return cached_lengths(ingest, winter_c, summer_c)
+
+
+def _buckets(classify, daily):
+    return None if daily else CompositionIndex(*classify)
+
+
+def _masks(ingest, candidates, winter_c, summer_c, contiguity, daily):
+    if not contiguity or daily:
+        return None
+    if candidates is not None:
+        return season_masks(ingest.T[candidates], winter_c, summer_c)
+    return cached_masks(ingest, winter_c, summer_c)
+
+
+def _score(candidates, classify, buckets, masks, prefs, contiguity):
+    if buckets is None:
+        dist = day_distance(np.stack(classify, axis=1), prefs)
+        return Results(*classify, dist, per_month=DAYS_PER_MONTH, rows=candidates)
+    dist = buckets.city_distances(prefs)
+    if masks is not None:
+        dist = contiguous_distance(dist, masks, contiguity)
+    return Results(*classify, dist, rows=candidates)
+
+
+def _rank(buckets, masks, score, prefs, k):
+    if masks is not None:
+        # Penalties are per city, not per composition bucket
+        top_rows, _ = top_k(score.dist, k)
+        return {"top_rows": top_rows, "ranker": CountingRanker(score.dist)}
+    if buckets is None:
+        top_rows, _ = top_k(score.dist, k)
+        return {"top_rows": top_rows, "ranker": CountingRanker(score.dist, max_value=MAX_DAY_SCORE)}
+    top_rows, _ = buckets.top_k(prefs, k)
+    return {"top_rows": top_rows, "ranker": CountingRanker(score.dist)}
+
+
+def _display(ingest, score, rank, winter_c, summer_c, unit, daily):
+    import pandas as pd
+
+    top = score.frame(ingest.df, rank["top_rows"])
+    rows = score.row_ids(rank["top_rows"])
+    # Daily mode labels each month by the season most of its days fall in
+    temps_c = ingest.daily[rows] if daily else ingest.T[rows]
+    codes = month_codes(temps_c, winter_c, summer_c) if daily else season_codes(temps_c, winter_c, summer_c)
+    calendar = pd.DataFrame(
+        SEASON_LABELS[codes],
+        index=top["City"].astype(str) + ", " + top["Country"].astype(str),
+        columns=MONTHS,
+    )
+    temps = temps_c * 9 / 5 + 32 if unit == "°F" else temps_c
+    return {"top": top, "calendar": calendar, "temps": np.asarray(temps)}
+
+
+def _sweep(ingest, candidates, rank, prefs, sweep, contiguity):
+    # The sweep scores plain distance; with a contiguity penalty its #1 would
+    # not be the table's
+    if sweep is None or contiguity or not len(rank["top_rows"]):
+        return None
+    winter_grid, summer_grid = sweep
+    index = ingest.season_index if candidates is None else SeasonIndex(ingest.T[candidates])
+    result = threshold_sweep(index, winter_grid, summer_grid, prefs, focus=int(rank["top_rows"][0]))
+    if candidates is not None:
+        # Back to dataset rows, like everything else the app shows
+        result.top_rows = np.where(result.top_rows >= 0, candidates[np.maximum(result.top_rows, 0)], -1)
+        result.focus = int(candidates[result.focus])
+    return result
+
+
+def app_pipeline():
+    return (
+        Pipeline()
+        .add("ingest", _ingest, params=["dataset"])
+        .add("candidates", _candidates, params=["region", "facets"], deps=["ingest"])
+        .add("classify", _classify, params=["winter_c", "summer_c", "daily"], deps=["ingest", "candidates"])
+        .add("buckets", _buckets, params=["daily"], deps=["classify"])
+        .add("masks", _masks, params=["winter_c", "summer_c", "contiguity", "daily"], deps=["ingest", "candidates"])
+        .add("score", _score, params=["prefs", "contiguity"], deps=["candidates", "classify", "buckets", "masks"])
+        .add("rank", _rank, params=["prefs", "k"], deps=["buckets", "masks", "score"])
+        .add("display", _display, params=["winter_c", "summer_c", "unit", "daily"], deps=["ingest", "score", "rank"])
+        .add("sweep", _sweep, params=["prefs", "sweep", "contiguity"], deps=["ingest", "candidates", "rank"])
+    )
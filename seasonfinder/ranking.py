@@ -0,0 +1,97 @@
+"""Ranking helpers that avoid sorting the whole dataset.
+
+All functions take per-city distances (lower is better, as returned by
+`scoring.distance`) and break ties by dataset order, matching
+`CompositionIndex.top_k`. Only the rows that are shown get ordered; a full
+ranking is produced only when something (an export) actually needs it.
+"""
+
+import numpy as np
+
+from .scoring import MAX_SCORE
+
+
+def top_k(dist, k):
+    """Row positions and distances of the k best rows, best first.
+
+    Partial selection (argpartition) is O(N); only the k winners are sorted.
+    """
+    dist = np.asarray(dist)
+    n = len(dist)
+    k = max(0, min(k, n))
+    if k == 0:
+        return np.empty(0, dtype=np.intp), dist[:0]
+    if k < n:
+        cand = np.argpartition(dist, k - 1)[:k]
+        cut = dist[cand].max()
+        # argpartition picks arbitrary rows among ties at the cut; redo the
+        # boundary so the earliest tied rows win
+        better = np.flatnonzero(dist < cut)
+        tied = np.flatnonzero(dist == cut)[: k - len(better)]
+        cand = np.concatenate([better, tied])
+    else:
+        cand = np.arange(n)
+    order = np.lexsort((cand, dist[cand]))
+    rows = cand[order]
+    return rows, dist[rows]
+
+
+def rank_of(dist, row):
+    """1-based rank of one row, without ranking anything else."""
+    dist = np.asarray(dist)
+    d = dist[row]
+    return 1 + int(np.count_nonzero(dist < d)) + int(np.count_nonzero(dist[:row] == d))
+
+
+def full_ranks(dist):
+    """1-based rank of every row (for exports)."""
+    dist = np.asarray(dist)
+    order = np.argsort(dist, kind="stable")
+    ranks = np.empty(len(dist), dtype=np.int64)
+    ranks[order] = np.arange(1, len(dist) + 1)
+    return ranks
+
+
+class CountingRanker:
+    """Ranks, percentiles and a histogram from one bincount pass.
+
+    Distances are small integers (0..MAX_SCORE), so a count per value and its
+    running total answer "how many cities beat this one" in O(1) after an
+    O(N) pass, with no comparison sort.
+    """
+
+    def __init__(self, dist, max_value=MAX_SCORE):
+        self.dist = np.asarray(dist)
+        self.n = len(self.dist)
+        self.counts = np.bincount(self.dist, minlength=max_value + 1)
+        # better[d]: number of rows with a distance strictly below d
+        self.better = np.concatenate(([0], np.cumsum(self.counts)[:-1]))
+
+    def beaten_by(self, row):
+        """Number of cities strictly better than `row`."""
+        return int(self.better[self.dist[row]])
+
+    def rank_of(self, row):
+        d = self.dist[row]
+        return 1 + int(self.better[d]) + int(np.count_nonzero(self.dist[:row] == d))
+
+    def percentile(self, row):
+        """Share of the other cities this one matches at least as well (0..100)."""
+        if self.n <= 1:
+            return 100.0
+        return 100.0 * (self.n - 1 - self.beaten_by(row)) / (self.n - 1)
+
+    def ranks(self):
+        """Stable 1-based rank of every row.
+
+        argsort(kind="stable") on small integer dtypes is a radix sort, i.e.
+        the counting sort this class is named after.
+        """
+        order = np.argsort(self.dist, kind="stable")
+        ranks = np.empty(self.n, dtype=np.int64)
+        ranks[order] = np.arange(1, self.n + 1)
+        return ranks
+
+    def histogram(self):
+        """Number of cities per match score (MAX_SCORE - distance), index = score."""
+        return self.counts[::-1].copy()
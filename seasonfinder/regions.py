@@ -0,0 +1,225 @@
+"""Inverse query: where in threshold space does a given city rank first?
+
+Season lengths only change when a threshold crosses some city's monthly
+temperature. With U the sorted distinct temperatures in the dataset, the
+winter-side counts (months <= w) are constant on [u_i, u_i+1) and the
+summer-side counts (months < s) on (u_i, u_i+1], so the threshold plane
+splits into a grid of breakpoint cells with one ranking each. The answer is
+the union of the cells where the city wins, merged into rectangles.
+
+Cells are evaluated in bulk, a chunk of cities at a time across every cell
+still in play. A cell is dropped as soon as any city beats the focus row there
+(lower distance, or equal distance and an earlier row), so with the strongest
+competitors first (`priority`) most cells are gone after the first chunk and
+the rest of the dataset is only checked against the few that survive.
+
+    regions = winning_regions(T_c, row, prefs, (-30, 20), (0, 40))
+    regions.rects   # [(w_lo, w_hi, s_lo, s_hi), ...]: winter in [w_lo, w_hi),
+                    # summer in (s_lo, s_hi]
+
+Only settings with winter below summer count (the app rejects the rest): cells
+lying wholly on or above that diagonal are never searched, and share()
+measures the part of each cell below it. The bounds themselves are valid
+settings, so the last winter cell and the first summer cell are closed there.
+
+Monthly data, plain distance (as the sweep).
+"""
+
+import numpy as np
+
+from .sweep import combine_distance
+
+CELL_BLOCK = 1 << 22  # cities × cells evaluated at once (~8 MiB per int16 array)
+SCOUT_ROWS = 1 << 14  # rows per scout pass (a few MiB of temporaries)
+
+
+def _winter_cells(U, lo, hi):
+    """Left edges of the winter cells covering [lo, hi]; cell i is [edge_i, edge_i+1)."""
+    cand = np.unique(np.concatenate(([lo], U[(U > lo) & (U <= hi)])))
+    ids = np.searchsorted(U, cand, side="right")  # months <= w is constant per id
+    _, first = np.unique(ids, return_index=True)
+    return cand[first]
+
+
+def _summer_cells(U, lo, hi):
+    """Right edges of the summer cells covering [lo, hi]; cell j is (edge_j-1, edge_j]."""
+    cand = np.unique(np.concatenate((U[(U >= lo) & (U < hi)], [hi])))
+    ids = np.searchsorted(U, cand, side="left")  # months < s is constant per id
+    # keep the last candidate of each id: the cell's right edge
+    last = len(ids) - 1 - np.unique(ids[::-1], return_index=True)[1]
+    return cand[np.sort(last)]
+
+
+def _counts(T, members, grid, strict):
+    """4×m×g int8: per row and grid value, months <= t (< t if strict) per member set."""
+    # Months on the leading axis, so the sums add contiguous m×g slabs
+    T = np.where(np.isnan(T), np.inf, T).T
+    cmp = (T[:, :, None] < grid) if strict else (T[:, :, None] <= grid)
+    return np.stack([(cmp & m.T[:, :, None]).view(np.int8).sum(axis=0, dtype=np.int8) for m in members])
+
+
+def _members(T):
+    delta = np.roll(T, -1, axis=1) - T
+    return [~np.isnan(T), delta > 0, delta < 0, delta == 0]
+
+
+def _scouts(T_c, w_cells, s_cells, prefs, side=6, per_cell=16, chunk_rows=SCOUT_ROWS):
+    """Rows that rank near the top somewhere on a coarse side×side grid of cells.
+
+    Tested first, they kill most cells in every part of the grid at once,
+    not just near the thresholds `priority` was ranked at. Rows are scanned
+    in chunks, keeping the best `per_cell` per cell, so the temporaries stay
+    bounded whatever the dataset size.
+    """
+    w_pick = w_cells[np.linspace(0, len(w_cells) - 1, min(side, len(w_cells))).astype(int)]
+    s_pick = s_cells[np.linspace(0, len(s_cells) - 1, min(side, len(s_cells))).astype(int)]
+    n_cells = len(w_pick) * len(s_pick)
+    best_rows = np.empty((n_cells, 0), dtype=np.intp)
+    best_dist = np.empty((n_cells, 0), dtype=np.int16)
+    for start in range(0, len(T_c), chunk_rows):
+        T = T_c[start:start + chunk_rows]
+        members = _members(T)
+        valid = members[0].sum(axis=1, dtype=np.int16)
+        low = _counts(T, members, w_pick, strict=False)
+        high = _counts(T, members, s_pick, strict=True)
+        dist = np.stack([
+            combine_distance(low[:, :, i], high[:, :, j], valid, prefs)
+            for i in range(len(w_pick)) for j in range(len(s_pick))
+        ])
+        dist = np.concatenate((best_dist, dist.astype(np.int16)), axis=1)
+        k = min(per_cell, dist.shape[1])
+        keep = np.argpartition(dist, k - 1, axis=1)[:, :k]
+        # Columns are the previous best first, then this chunk's rows
+        prev = best_rows.shape[1]
+        chosen = np.take_along_axis(best_rows, np.minimum(keep, max(prev - 1, 0)), axis=1) if prev else keep
+        best_rows = np.where(keep < prev, chosen, start + keep - prev)
+        best_dist = np.take_along_axis(dist, keep, axis=1)
+    return np.unique(best_rows)
+
+
+def _area_below_diagonal(w0, w1, s0, s1):
+    """Area of {(w, s): w0 <= w <= w1, s0 <= s <= s1, w < s}, elementwise."""
+    # Winter up to s0: every summer in the cell; from s0 to s1: a triangle
+    flat = np.clip(np.minimum(w1, s0) - w0, 0, None) * np.clip(s1 - s0, 0, None)
+    p, q = np.maximum(w0, s0), np.minimum(w1, s1)
+    return flat + np.where(q > p, ((s1 - p) ** 2 - (s1 - q) ** 2) / 2, 0.0)
+
+
+class Regions:
+    def __init__(self, row, winter_edges, summer_edges, wins):
+        self.row = row
+        self.winter_edges = winter_edges  # gw + 1 edges, [edge_i, edge_i+1)
+        self.summer_edges = summer_edges  # gs + 1 edges, (edge_j, edge_j+1]
+        self.wins = wins  # gw×gs bool
+        self.rects = self._rectangles()
+
+    @property
+    def n_cells(self):
+        return self.wins.size
+
+    def _areas(self):
+        w, s = self.winter_edges, self.summer_edges
+        return _area_below_diagonal(w[:-1, None], w[1:, None], s[None, :-1], s[None, 1:])
+
+    def share(self):
+        """Fraction of the searched threshold area (in degrees², winter < summer) where the row wins."""
+        areas = self._areas()
+        total = areas.sum()
+        return float(areas[self.wins].sum() / total) if total > 0 else 0.0
+
+    def contains(self, winter_c, summer_c):
+        w, s = self.winter_edges, self.summer_edges
+        if not (winter_c < summer_c and w[0] <= winter_c <= w[-1] and s[0] <= summer_c <= s[-1]):
+            return False
+        # The bounds belong to the last winter and first summer cell
+        i = min(np.searchsorted(w, winter_c, side="right") - 1, self.wins.shape[0] - 1)
+        j = max(np.searchsorted(s, summer_c, side="left") - 1, 0)
+        return bool(self.wins[i, j])
+
+    def _rectangles(self):
+        """Merge winning cells: runs along summer, then identical runs down winter.
+
+        Zero-width cells (a bound that is itself a breakpoint) have no area;
+        they only answer contains() at that bound, so they are left out.
+        """
+        wins = self.wins & (np.diff(self.winter_edges) > 0)[:, None] & (np.diff(self.summer_edges) > 0)[None, :]
+        rects = []
+        open_runs = {}  # (j0, j1) -> first winter row
+        for i in range(wins.shape[0] + 1):
+            runs = set()
+            if i < wins.shape[0]:
+                row = np.concatenate(([False], wins[i], [False]))
+                edges = np.flatnonzero(row[1:] != row[:-1])
+                runs = set(zip(edges[::2], edges[1::2]))
+            for run in list(open_runs):
+                if run not in runs:
+                    i0 = open_runs.pop(run)
+                    rects.append((i0, i, run[0], run[1]))
+            for run in runs:
+                open_runs.setdefault(run, i)
+        rects.sort()
+        w, s = self.winter_edges, self.summer_edges
+        return [(w[i0], w[i1], s[j0], s[j1]) for i0, i1, j0, j1 in rects]
+
+
+def winning_regions(T_c, row, prefs, winter_bounds=None, summer_bounds=None, priority=None, chunk=64):
+    """Threshold cells (within the bounds) where `row` is the #1 match for `prefs`.
+
+    `priority` is an optional row order to test competitors in (best first
+    at the current thresholds prunes fastest); default is dataset order.
+    """
+    T_c = np.asarray(T_c, dtype=float)
+    U = np.unique(T_c[~np.isnan(T_c)])
+    if not len(U):
+        U = np.zeros(1)
+    w_lo, w_hi = winter_bounds if winter_bounds is not None else (U[0] - 1, U[-1] + 1)
+    s_lo, s_hi = summer_bounds if summer_bounds is not None else (U[0] - 1, U[-1] + 1)
+    w_cells = _winter_cells(U, w_lo, w_hi)
+    s_cells = _summer_cells(U, s_lo, s_hi)
+    winter_edges = np.append(w_cells, w_hi)
+    summer_edges = np.insert(s_cells, 0, s_lo)
+
+    focus = T_c[row:row + 1]
+    focus_members = _members(focus)
+    f_low = _counts(focus, focus_members, w_cells, strict=False)[:, 0]
+    f_high = _counts(focus, focus_members, s_cells, strict=True)[:, 0]
+    focus_dist = combine_distance(
+        f_low[:, :, None], f_high[:, None, :], focus_members[0].sum(dtype=np.int16), prefs
+    )
+
+    # Cells with some winter < summer setting; the rest can't win
+    iw, js = np.nonzero(winter_edges[:-1, None] < summer_edges[None, 1:])
+    order = np.arange(len(T_c)) if priority is None else np.asarray(priority)
+    if len(T_c) > chunk:
+        scouts = _scouts(T_c, w_cells, s_cells, prefs)
+        rest = np.ones(len(T_c), dtype=bool)
+        rest[scouts] = False
+        order = np.concatenate((scouts, order[rest[order]]))
+    order = order[order != row]
+    start = 0
+    while start < len(order) and len(iw):
+        rows = order[start:start + chunk]
+        start += len(rows)
+        chunk = min(chunk * 2, 4096)  # survivors are few after the first chunks
+        T = T_c[rows]
+        members = _members(T)
+        valid = members[0].sum(axis=1, dtype=np.int16)[:, None]
+        # Counts only at the grid values that still have live cells
+        uw, cw = np.unique(iw, return_inverse=True)
+        us, cs = np.unique(js, return_inverse=True)
+        low = _counts(T, members, w_cells[uw], strict=False)
+        high = _counts(T, members, s_cells[us], strict=True)
+        earlier = (rows < row)[:, None]
+        keep = np.ones(len(iw), dtype=bool)
+        block = max(1, CELL_BLOCK // len(rows))
+        for a in range(0, len(iw), block):
+            b_iw, b_js = iw[a:a + block], js[a:a + block]
+            dist = combine_distance(low[:, :, cw[a:a + block]], high[:, :, cs[a:a + block]], valid, prefs)
+            d_f = focus_dist[b_iw, b_js]
+            beaten = (dist < d_f) | ((dist == d_f) & earlier)
+            keep[a:a + block] = ~beaten.any(axis=0)
+        iw, js = iw[keep], js[keep]
+
+    wins = np.zeros((len(w_cells), len(s_cells)), dtype=bool)
+    wins[iw, js] = True
+    return Regions(row, winter_edges, summer_edges, wins)
@@ -0,0 +1,74 @@
+"""Per-city results kept as NumPy arrays instead of frame copies.
+
+`Results` holds the season lengths and distance for every city, aligned with
+the dataset's rows by position. Nothing is copied from the source frame until
+`frame()` is asked for specific rows (the 20 shown, or everything for an
+export), so wide uploads with many metadata columns cost nothing extra per
+rerun.
+
+Daily-resolution results keep their lengths and distance in days
+(`per_month` = 365/12); `frame()` reports them as fractional months.
+
+Results for a filtered subset carry `rows`, the dataset row of each entry;
+positions passed to `frame()` and the rankers are then positions in the
+subset, and `row_ids()` / `position()` convert.
+"""
+
+import numpy as np
+
+from .scoring import MAX_SCORE
+
+SEASONS = ["Winter", "Spring", "Summer", "Autumn"]
+RESULT_COLS = ["Rank", "Score", "Match %", *SEASONS, "Row"]
+
+
+class Results:
+    def __init__(self, winter, spring, summer, fall, dist, per_month=1, rows=None):
+        self.lengths = (winter, spring, summer, fall)
+        self.dist = dist
+        self.per_month = per_month  # length/distance units per month
+        self.rows = rows  # dataset row per entry; None means entry i is row i
+
+    def __len__(self):
+        return len(self.dist)
+
+    @property
+    def nbytes(self):
+        extra = 0 if self.rows is None else self.rows.nbytes
+        return self.dist.nbytes + sum(a.nbytes for a in self.lengths) + extra
+
+    def row_ids(self, positions):
+        """Dataset rows of the given result positions."""
+        positions = np.asarray(positions, dtype=np.intp)
+        return positions if self.rows is None else self.rows[positions]
+
+    def position(self, row):
+        """Result position of a dataset row, or -1 if it was filtered out."""
+        if self.rows is None:
+            return int(row) if 0 <= row < len(self.dist) else -1
+        i = int(np.searchsorted(self.rows, row))
+        return i if i < len(self.rows) and self.rows[i] == row else -1
+
+    def frame(self, df, rows, ranks=None, columns=("City", "Country")):
+        """Materialize the given result positions as a display frame.
+
+        `ranks` defaults to 1..len(rows), i.e. rows are assumed best-first.
+        The Row column is the dataset row (position in df). `columns` that df
+        lacks are skipped.
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        # Result columns win over same-named source columns (e.g. a re-uploaded export);
+        # get_indexer gives -1 for a missing name, which iloc reads as the last column
+        columns = [c for c in columns if c not in RESULT_COLS and c in df.columns]
+        out = df.iloc[self.row_ids(rows), df.columns.get_indexer(columns)].reset_index(drop=True)
+        out.insert(0, "Rank", np.arange(1, len(rows) + 1) if ranks is None else ranks)
+        if self.per_month == 1:
+            score = MAX_SCORE - self.dist[rows].astype(np.int16)
+        else:
+            score = (MAX_SCORE - self.dist[rows] / self.per_month).round(1)
+        out["Score"] = score
+        out["Match %"] = np.clip(score / MAX_SCORE * 100, 0, 100).round(1)
+        for name, arr in zip(SEASONS, self.lengths):
+            out[name] = arr[rows] if self.per_month == 1 else (arr[rows] / self.per_month).round(1)
+        out["Row"] = self.row_ids(rows)  # position in df
+        return out
@@ -0,0 +1,172 @@
+"""Scoring by season-length composition instead of by city.
+
+A city's score only depends on its (winter, spring, summer, autumn) month
+counts. Those sum to 12 (less if the CSV has missing months), so there are at
+most 455 distinct compositions however many rows the dataset has.
+`CompositionIndex` groups the cities into one bucket per composition once per
+threshold pair; scoring a preference is then 455 distances, and the top K are
+read bucket by bucket.
+
+That assumes the winter threshold is below the summer one, which the app,
+CLI and server insist on. Overlapping thresholds count a month as both
+Winter and Summer: lengths can sum to 24 and there are more buckets, which
+the code here still handles.
+"""
+
+import numpy as np
+
+MAX_SCORE = 48  # 4 seasons × 12 months max difference
+
+_BASE = 13  # each length is 0..12
+
+
+def composition_codes(winter, spring, summer, fall):
+    """Pack four 0..12 lengths into one uint16 code."""
+    codes = np.asarray(winter, dtype=np.uint16) * _BASE
+    codes += np.asarray(spring, dtype=np.uint16)
+    codes *= _BASE
+    codes += np.asarray(summer, dtype=np.uint16)
+    codes *= _BASE
+    codes += np.asarray(fall, dtype=np.uint16)
+    return codes
+
+
+def decode_compositions(codes):
+    codes = np.asarray(codes, dtype=np.int64)
+    out = np.empty((len(codes), 4), dtype=np.int8)
+    for j in range(3, -1, -1):
+        out[:, j] = codes % _BASE
+        codes = codes // _BASE
+    return out
+
+
+def distance(lengths, prefs):
+    """Sum of absolute month differences (0 is a perfect match)."""
+    lengths = np.asarray(lengths, dtype=np.int16)
+    return np.abs(lengths - np.asarray(prefs, dtype=np.int16)).sum(axis=-1)
+
+
+def contiguity_penalty(masks):
+    """Extra episodes per city: a season that comes back counts once per return.
+
+    `masks` are the four uint16 month masks from seasons.season_masks(); a
+    city whose winter is Dec-Feb plus a cold March after a warm spell scores
+    1. Episodes wrap Dec -> Jan, so Nov-Feb is one winter. Returns int8.
+    """
+    from .seasons import EPISODES
+
+    extra = np.zeros(len(masks[0]), dtype=np.int8)
+    for m in masks:
+        extra += np.maximum(EPISODES[m] - 1, 0).astype(np.int8)
+    return extra
+
+
+def contiguous_distance(dist, masks, weight=1):
+    """`dist` plus `weight` per extra season episode, capped at MAX_SCORE.
+
+    While winter_c < summer_c plain distances never exceed 24 (both sides sum
+    to 12), so with weight 1 the cap is never reached. Overlapping thresholds
+    count months twice, distances reach 36 and the cap can apply.
+    """
+    penalty = contiguity_penalty(masks).astype(np.int16) * weight
+    return np.minimum(np.asarray(dist, dtype=np.int16) + penalty, MAX_SCORE).astype(np.int8)
+
+
+class CompositionIndex:
+    """Cities bucketed by their (winter, spring, summer, autumn) tuple.
+
+    Rows inside a bucket stay in dataset order, and ranking ties are always
+    broken by dataset order, so results are deterministic.
+    """
+
+    def __init__(self, winter, spring, summer, fall):
+        codes = composition_codes(winter, spring, summer, fall)
+        self.n = len(codes)
+        counts = np.bincount(codes, minlength=_BASE ** 4)
+        self.codes = np.flatnonzero(counts)  # occupied buckets, ascending
+        self.sizes = counts[self.codes]
+        self.starts = np.concatenate(([0], np.cumsum(self.sizes)))
+        self.lengths = decode_compositions(self.codes)  # B×4
+        # Stable sort on uint16 is a radix sort: O(N), not a comparison sort
+        self.order = np.argsort(codes, kind="stable")
+        bucket_of_code = np.zeros(_BASE ** 4, dtype=np.int32)
+        bucket_of_code[self.codes] = np.arange(len(self.codes), dtype=np.int32)
+        self.bucket = bucket_of_code[codes]  # bucket id per city
+
+    def __len__(self):
+        return self.n
+
+    @property
+    def nbytes(self):
+        arrays = [self.codes, self.sizes, self.starts, self.lengths, self.order, self.bucket]
+        return sum(a.nbytes for a in arrays)
+
+    def members(self, b):
+        return self.order[self.starts[b]:self.starts[b + 1]]
+
+    def bucket_distances(self, prefs):
+        return distance(self.lengths, prefs)
+
+    def city_distances(self, prefs):
+        """Distance per city, by gathering the bucket distances."""
+        return self.bucket_distances(prefs).astype(np.int8)[self.bucket]
+
+    def top_k(self, prefs, k):
+        """Row positions and distances of the k best cities, best first."""
+        return self._expand(self.bucket_distances(prefs), k)
+
+    def top_k_batch(self, profiles, k, block=1024):
+        """Top k for many preference profiles at once.
+
+        `profiles` is an M×4 array of (winter, spring, summer, autumn) months.
+        Returns (rows, dist), both M×k; slots past the dataset size are -1.
+
+        Distances depend on the profile only through its composition, so
+        duplicate profiles (there are at most 455 that sum to 12) are scored
+        once. Bucket distances are computed `block` profiles at a time as a
+        block×B matrix; the M×N city distance matrix is never materialized.
+        """
+        profiles = np.asarray(profiles, dtype=np.int16).reshape(-1, 4)
+        unique, inverse = np.unique(profiles, axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        width = max(0, k)
+        u_rows = np.full((len(unique), width), -1, dtype=np.int64)
+        u_dist = np.full((len(unique), width), -1, dtype=np.int16)
+        for start in range(0, len(unique), block):
+            chunk = unique[start:start + block]
+            # block×B distances in one broadcast
+            dists = np.abs(self.lengths[None, :, :].astype(np.int16) - chunk[:, None, :]).sum(axis=2)
+            for i, bucket_dist in enumerate(dists):
+                rows, dist = self._expand(bucket_dist, k)
+                u_rows[start + i, :len(rows)] = rows
+                u_dist[start + i, :len(rows)] = dist
+        return u_rows[inverse], u_dist[inverse]
+
+    def _expand(self, dist, k):
+        """Read the k best cities bucket by bucket, given each bucket's distance."""
+        by_dist = np.argsort(dist, kind="stable")
+        rows, dists = [], []
+        need = min(k, self.n)
+        i = 0
+        while need > 0:
+            # All buckets sharing this distance tie; merge them by row
+            d = dist[by_dist[i]]
+            j = i
+            while j < len(by_dist) and dist[by_dist[j]] == d:
+                j += 1
+            group = np.sort(np.concatenate([self.members(b)[:need] for b in by_dist[i:j]]))
+            group = group[:need]
+            rows.append(group)
+            dists.append(np.full(len(group), d, dtype=np.int16))
+            need -= len(group)
+            i = j
+        if not rows:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.int16)
+        return np.concatenate(rows), np.concatenate(dists)
+
+
+def rank_profiles(T_c, winter_c, summer_c, profiles, k=20):
+    """Classify T once, then top k for every row of the M×4 `profiles`."""
+    from .seasons import season_lengths
+
+    return CompositionIndex(*season_lengths(T_c, winter_c, summer_c)).top_k_batch(profiles, k)
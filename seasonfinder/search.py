@@ -0,0 +1,127 @@
+"""Fuzzy place-name search over the whole dataset.
+
+Names are normalized (accents stripped, case folded, punctuation to spaces)
+and cut into character trigrams, padded so word starts count: "São Paulo"
+-> " sao paulo " -> " sa", "sao", "ao ", ... Each distinct trigram gets an
+id; `TrigramIndex` keeps the rows containing each one CSR style (as
+data.KeyIndex does for keys), with how often it occurs in that name. A
+query looks up its own trigrams and counts, with one weighted `np.bincount`
+over their row lists, how many each row shares. Rows are ranked by the
+share of the query's trigrams they contain, then by how little else they
+contain (Dice), then by row: typos and missing accents still find the
+place, and "paris" ranks Paris, France above Paris, Texas, USA.
+
+    index = TrigramIndex(city + " " + country)
+    rows, scores = index.search("zurich", k=10)
+
+Building is vectorized (one codepoint array for all names), so millions of
+rows index in seconds.
+"""
+
+import numpy as np
+
+CANDIDATES = 50  # rows per result slot kept for the final ordering
+# Combining marks left over from NFKD decomposition (accents, umlauts, ...)
+COMBINING = r"[\u0300-\u036f\u1ab0-\u1aff\u1dc0-\u1dff\u20d0-\u20ff\ufe20-\ufe2f]"
+
+
+def normalize(text):
+    """Lowercase, accent-free, single-spaced version of `text` for matching."""
+    return normalize_all([text])[0]
+
+
+def normalize_all(texts):
+    """normalize() over a sequence of strings, vectorized through pandas."""
+    import pandas as pd
+
+    s = pd.Series(texts, dtype=object).fillna("").astype(str).str.normalize("NFKD")
+    s = s.str.replace(COMBINING, "", regex=True)  # "ã" decomposed is "a" + U+0303
+    s = s.str.casefold().str.replace(r"[\W_]+", " ", regex=True).str.strip()
+    return s.to_numpy()
+
+
+def _grams(texts):
+    """(gram ids, row of each gram) for padded normalized `texts`; int64 ids."""
+    padded = [f" {t} " for t in texts]
+    lengths = np.fromiter((len(t) for t in padded), dtype=np.int64, count=len(padded))
+    codes = np.frombuffer("".join(padded).encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+    ends = np.cumsum(lengths)
+    rows = np.repeat(np.arange(len(padded)), lengths)
+    # A trigram starts at i if it ends inside the same name
+    start = np.flatnonzero(np.arange(len(codes)) + 2 < np.repeat(ends, lengths))
+    # Codepoints fit in 21 bits, so three of them pack into one int64
+    ids = (codes[start] << 42) | (codes[start + 1] << 21) | codes[start + 2]
+    return ids, rows[start]
+
+
+class TrigramIndex:
+    def __init__(self, texts):
+        import pandas as pd
+
+        texts = normalize_all(texts)
+        self.n = len(texts)
+        ids, rows = _grams(texts)
+        codes, uniques = pd.factorize(ids)
+        order = np.argsort(uniques)
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        self.grams = uniques[order]  # sorted, for searchsorted lookups
+        # One entry per distinct (trigram, row), grouped by trigram; the
+        # weight is how often the trigram occurs in that name
+        keys, weights = np.unique(rank[codes] * max(self.n, 1) + rows, return_counts=True)
+        self.rows = (keys % max(self.n, 1)).astype(np.int32 if self.n < 2**31 else np.int64)
+        self.weights = np.minimum(weights, 255).astype(np.uint8)
+        counts = np.bincount(keys // max(self.n, 1), minlength=len(self.grams))
+        self.starts = np.concatenate(([0], np.cumsum(counts)))
+        self.sizes = np.bincount(rows, minlength=self.n).astype(np.int32)  # trigrams per name
+
+    def __len__(self):
+        return self.n
+
+    @property
+    def nbytes(self):
+        return self.grams.nbytes + self.starts.nbytes + self.rows.nbytes + self.weights.nbytes + self.sizes.nbytes
+
+    def _postings(self, grams):
+        parts = [self.rows[self.starts[i]:self.starts[i + 1]] for i in grams]
+        return np.concatenate(parts) if parts else self.rows[:0]
+
+    def search(self, query, k=10, rows=None):
+        """(rows, scores) of the best `k` matches for `query`, best first.
+
+        Scores are the share of the query's trigrams found (0..1]. `rows`
+        (sorted positions) restricts the search to those rows.
+        """
+        ids, _ = _grams([normalize(query)])
+        ids, q_counts = np.unique(ids, return_counts=True)
+        total = q_counts.sum()
+        empty = (np.empty(0, dtype=np.intp), np.empty(0))
+        if not len(ids) or not len(self.grams):
+            return empty
+        at = np.searchsorted(self.grams, ids)
+        found = (at < len(self.grams)) & (self.grams[np.minimum(at, len(self.grams) - 1)] == ids)
+        if not found.any():
+            return empty
+        # Shared trigrams, counted with multiplicity: min(count in query, in name).
+        # Trigrams the query has once count 1 per row: a plain bincount
+        at, q_counts = at[found], q_counts[found]
+        once = q_counts == 1
+        shared = np.bincount(self._postings(at[once]), minlength=self.n)
+        if not once.all():
+            span = [np.arange(self.starts[i], self.starts[i + 1]) for i in at[~once]]
+            q = np.repeat(q_counts[~once], [len(x) for x in span])
+            span = np.concatenate(span)
+            shared = shared + np.bincount(
+                self.rows[span], weights=np.minimum(self.weights[span], q), minlength=self.n
+            ).astype(np.int64)
+        if rows is not None:
+            mask = np.zeros(self.n, dtype=bool)
+            mask[rows] = True
+            shared[~mask] = 0
+        hits = np.flatnonzero(shared)
+        if len(hits) > k * CANDIDATES:
+            hits = hits[np.argpartition(-shared[hits], k * CANDIDATES - 1)[:k * CANDIDATES]]
+        coverage = shared[hits] / total
+        dice = 2 * shared[hits] / (total + self.sizes[hits])
+        order = np.lexsort((hits, -dice, -coverage))[:k]
+        return hits[order], coverage[order]
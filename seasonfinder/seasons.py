@@ -0,0 +1,322 @@
+"""Season-length counting that doesn't rescan T on every slider move.
+
+The season length of a city is a step function of the thresholds: it only
+changes when a threshold crosses one of that city's monthly temperatures.
+`SeasonIndex` sorts each city's months once per dataset (overall, and split
+into warming / cooling / flat months), after which the four lengths for any
+(winter, summer) pair are counts over the sorted columns. Because the rows are
+sorted, column minima and maxima are increasing, so whole columns are settled
+by one comparison and the scan stops at the first column that lies entirely
+above the threshold. The sorted columns are float32; see _SortedMonths for
+why the counts are still exact.
+"""
+
+import numpy as np
+
+# Season codes used by season_codes(); index SEASON_LABELS with them
+WINTER, SPRING, SUMMER, AUTUMN, UNCLASSIFIED = range(5)
+SEASON_LABELS = np.array(["Winter", "Spring", "Summer", "Autumn", "Transition"])
+
+# Most distinct temperatures SeasonIndex keeps to resolve float32 rounding ties
+VALUE_TABLE_MAX = 1 << 16
+
+
+def _mask_tables():
+    """Lookup tables indexed by a 12-bit month mask (bit j = month j, Jan = bit 0)."""
+    bits = (np.arange(4096)[:, None] >> np.arange(12)) & 1
+    # An episode starts at a set month whose previous month (Dec before Jan) is clear
+    episodes = (bits & (1 - np.roll(bits, 1, axis=1))).sum(axis=1)
+    episodes[4095] = 1  # all year: one episode that never starts
+    # Longest run, going round the year twice so Dec -> Jan runs join up
+    run = np.zeros(4096, dtype=np.int64)
+    longest = np.zeros(4096, dtype=np.int64)
+    for j in range(24):
+        run = (run + 1) * bits[:, j % 12]
+        np.maximum(longest, run, out=longest)
+    # The first half (rounded down) of the set months, in month order
+    first_half = bits & (np.cumsum(bits, axis=1) <= bits.sum(axis=1, keepdims=True) // 2)
+    flat_spring = (first_half << np.arange(12)).sum(axis=1)
+    return (
+        np.minimum(longest, 12).astype(np.int8),
+        episodes.astype(np.int8),
+        flat_spring.astype(np.uint16),
+    )
+
+
+# LONGEST_RUN[m]: longest consecutive stretch of months in m; EPISODES[m]:
+# separate stretches; FLAT_SPRING[m]: the months of m that a flat-month split
+# gives to Spring. All wrap Dec -> Jan.
+LONGEST_RUN, EPISODES, FLAT_SPRING = _mask_tables()
+
+
+def _next_delta(T):
+    return np.roll(T, -1, axis=1) - T  # next_month - this_month
+
+
+# Which months each sorted view holds, as functions of (rows of) T
+def _valid(T):
+    return ~np.isnan(T)
+
+
+def _warming(T):
+    return _next_delta(T) > 0
+
+
+def _cooling(T):
+    return _next_delta(T) < 0
+
+
+def _flat(T):
+    return _next_delta(T) == 0
+
+
+def _sorted_columns(T, member):
+    """Row-sorted float32 copy of T (non-members pushed to +inf), stored column-major.
+
+    Columns that are +inf for every row carry no information and are dropped.
+    """
+    S = np.where(member, T.astype(np.float32), np.float32(np.inf))
+    S.sort(axis=1)
+    # inf columns sort to the end: keep as many as the fullest row needs
+    keep = int(member.sum(axis=1).max()) if len(S) else 0
+    S = np.ascontiguousarray(S[:, :keep].T)
+    S.setflags(write=False)
+    return S
+
+
+class _SortedMonths:
+    """The months of T picked by `member`, sorted per row and held as float32.
+
+    Rounding to float32 never reorders values, so comparing rounded months
+    with the rounded threshold settles every month except those that round
+    to the threshold itself. SeasonIndex usually knows which way those go
+    and passes a `cut` to compare against; otherwise rows with such a tie
+    are recounted from T in float64. Either way the counts are exact at half
+    the memory of float64 columns.
+    """
+
+    def __init__(self, T, member, mask):
+        self.T = T  # not copied; the dataset's own matrix
+        self.member = member  # recomputes `mask` for some rows of T
+        self.cols = _sorted_columns(T, mask)
+        self.col_min = self.cols.min(axis=1) if self.cols.size else np.empty(0, dtype=np.float32)
+        self.col_max = self.cols.max(axis=1) if self.cols.size else np.empty(0, dtype=np.float32)
+
+    @property
+    def nbytes(self):
+        return self.cols.nbytes + self.col_min.nbytes + self.col_max.nbytes
+
+    def count(self, t, strict=False, cut=None):
+        """Per-row number of months with temp <= t (or < t when strict).
+
+        `cut` is a float32 value such that month <= cut exactly when the
+        float64 comparison holds (see SeasonIndex._cut).
+        """
+        exact = cut is not None
+        t32 = cut if exact else np.float32(t)
+        n = self.cols.shape[1]
+        out = np.zeros(n, dtype=np.int8)
+        tie = None
+        for j in range(len(self.cols)):
+            lo, hi = self.col_min[j], self.col_max[j]
+            if hi < t32 or (exact and hi == t32):
+                out += 1
+                continue
+            if lo > t32:
+                break  # every later column is larger still
+            col = self.cols[j]
+            if exact:
+                out += col <= t32
+                continue
+            out += col < t32
+            at = col == t32
+            if at.any():
+                if tie is None:
+                    tie = at
+                else:
+                    tie |= at
+        if tie is not None:
+            rows = np.flatnonzero(tie)
+            T = self.T[rows]
+            hit = (T < t) if strict else (T <= t)
+            out[rows] = (hit & self.member(T)).sum(axis=1)
+        return out
+
+    def between(self, w, s, cut_w=None, cut_s=None):
+        """Months with w < temp < s."""
+        n = self.count(s, True, cut_s) - self.count(w, False, cut_w)
+        return np.maximum(n, 0, out=n)
+
+
+def _value_table(T):
+    """Sorted distinct non-NaN values of T, or None if there are more than VALUE_TABLE_MAX."""
+    import pandas as pd
+
+    flat = T.reshape(-1)
+    # Continuous data gives up on a sample instead of hashing every value
+    sample = 4 * VALUE_TABLE_MAX
+    if len(flat) > sample and len(pd.unique(flat[:sample])) > VALUE_TABLE_MAX:
+        return None
+    values = pd.unique(flat)
+    values = np.sort(values[~np.isnan(values)])
+    return values if len(values) <= VALUE_TABLE_MAX else None
+
+
+class SeasonIndex:
+    """Sorted per-city months; answers season lengths for any thresholds.
+
+    Build once per dataset (°C matrix, kept by reference for recounting
+    ties, so don't modify it). `lengths()` returns int8 arrays that
+    match the transition rules in app.py: a month is Winter if <= winter,
+    Summer if >= summer, otherwise Spring while warming and Autumn while
+    cooling, with flat months split evenly (Spring gets the smaller half).
+    """
+
+    def __init__(self, T_c):
+        T_c = np.asarray(T_c, dtype=float)
+        delta = _next_delta(T_c)
+        valid = _valid(T_c)
+        self.n = len(T_c)
+        self.valid_len = valid.sum(axis=1).astype(np.int8)
+        self._all = _SortedMonths(T_c, _valid, valid)
+        self._warming = _SortedMonths(T_c, _warming, delta > 0)
+        self._cooling = _SortedMonths(T_c, _cooling, delta < 0)
+        self._flat = _SortedMonths(T_c, _flat, delta == 0)
+        # Measured temperatures take few distinct values (0.1° steps); with
+        # them at hand a threshold's float32 ties resolve without recounting
+        self._values = _value_table(T_c)
+        self._values32 = None if self._values is None else self._values.astype(np.float32)
+
+    def __len__(self):
+        return self.n
+
+    @property
+    def nbytes(self):
+        parts = [self._all, self._warming, self._cooling, self._flat]
+        tables = 0 if self._values is None else self._values.nbytes + self._values32.nbytes
+        return self.valid_len.nbytes + tables + sum(p.nbytes for p in parts)
+
+    def _cut(self, t, strict=False):
+        """float32 c with float32(month) <= c iff month <= t (< t if strict); None if unknown."""
+        if self._values is None:
+            return None
+        t32 = np.float32(t)
+        if not np.isfinite(t32):
+            return None
+        lo = np.searchsorted(self._values32, t32, "left")
+        hi = np.searchsorted(self._values32, t32, "right")
+        if hi - lo > 1:
+            return None  # several temperatures round to t32; recount them
+        if hi == lo or ((self._values[lo] < t) if strict else (self._values[lo] <= t)):
+            return t32
+        return np.nextafter(t32, np.float32(-np.inf))
+
+    def winter_len(self, winter_c):
+        return self._all.count(winter_c, False, self._cut(winter_c))
+
+    def summer_len(self, summer_c):
+        return self.valid_len - self._all.count(summer_c, True, self._cut(summer_c, strict=True))
+
+    def threshold_counts(self, t, strict=False):
+        """4×N int8 months <= t (< t if strict): overall, warming, cooling, flat.
+
+        Every length is a difference of these for the two thresholds, which
+        is what lets sweep.py reuse one pass per threshold value.
+        """
+        cut = self._cut(t, strict)
+        parts = [self._all, self._warming, self._cooling, self._flat]
+        return np.stack([p.count(t, strict, cut) for p in parts])
+
+    def lengths(self, winter_c, summer_c):
+        """(winter, spring, summer, autumn) month counts per city."""
+        cuts = self._cut(winter_c), self._cut(summer_c, strict=True)
+        flat = self._flat.between(winter_c, summer_c, *cuts)
+        spring = self._warming.between(winter_c, summer_c, *cuts) + flat // 2
+        fall = self._cooling.between(winter_c, summer_c, *cuts) + (flat - flat // 2)
+        return self.winter_len(winter_c), spring, self.summer_len(summer_c), fall
+
+
+def season_lengths(T_c, winter_c, summer_c):
+    """One-shot (winter, spring, summer, autumn) counts straight from the masks.
+
+    Cheaper than building a SeasonIndex when the thresholds are only used
+    once (CLI runs, batch jobs); identical results.
+    """
+    T_c = np.asarray(T_c, dtype=float)
+    is_winter = T_c <= winter_c
+    is_summer = T_c >= summer_c
+
+    # Transition months are neither winter nor summer
+    is_transition = ~is_winter & ~is_summer
+
+    # month-to-month temperature change (wrap around Dec->Jan)
+    delta = np.roll(T_c, -1, axis=1) - T_c  # next_month - this_month
+
+    # Spring-like if warming, Autumn-like if cooling, flat months split evenly
+    flat = (is_transition & (delta == 0)).sum(axis=1, dtype=np.int8)
+    spring = (is_transition & (delta > 0)).sum(axis=1, dtype=np.int8) + flat // 2
+    fall = (is_transition & (delta < 0)).sum(axis=1, dtype=np.int8) + (flat - flat // 2)
+    winter = is_winter.sum(axis=1, dtype=np.int8)
+    summer = is_summer.sum(axis=1, dtype=np.int8)
+    return winter, spring, summer, fall
+
+
+def season_codes(T_c, winter_c, summer_c):
+    """int8 season code for every month of every row (N×12).
+
+    Same rules as SeasonIndex.lengths(), so the labels always add up to the
+    counts: in particular flat transition months are split like the counts
+    are, the first half (rounded down, in month order) Spring and the rest
+    Autumn. Where the thresholds overlap (winter_c >= summer_c, which the
+    app, CLI and server reject) a month is labelled Winter only, so the labels no
+    longer add up to the counts, which count it as Summer too. Months
+    that can't be classified (missing temperatures) are UNCLASSIFIED.
+
+    Any number of columns works (daily.py feeds it 365 days); float32 input
+    stays float32.
+    """
+    T_c = np.asarray(T_c)
+    if T_c.dtype.kind != "f":
+        T_c = T_c.astype(float)
+    is_winter = T_c <= winter_c
+    is_summer = T_c >= summer_c
+    is_transition = ~is_winter & ~is_summer
+
+    delta = np.roll(T_c, -1, axis=1) - T_c  # next_month - this_month
+    is_flat = is_transition & (delta == 0)
+    flat_seen = np.cumsum(is_flat, axis=1, dtype=np.int16)  # 1-based position among flat months
+    flat_spring = is_flat & (flat_seen <= flat_seen[:, -1:] // 2)
+
+    codes = np.full(T_c.shape, UNCLASSIFIED, dtype=np.int8)
+    codes[is_transition & ((delta > 0) | flat_spring)] = SPRING
+    codes[is_transition & ((delta < 0) | (is_flat & ~flat_spring))] = AUTUMN
+    codes[is_summer] = SUMMER
+    codes[is_winter] = WINTER
+    return codes
+
+
+def pack_months(mask):
+    """N×12 bool -> N uint16 month masks (bit j = month j)."""
+    packed = np.packbits(np.asarray(mask, dtype=bool), axis=1, bitorder="little")
+    return packed.view("<u2").reshape(-1).astype(np.uint16, copy=False)
+
+
+def season_masks(T_c, winter_c, summer_c):
+    """(winter, spring, summer, autumn) uint16 month masks per row.
+
+    8 bytes per city instead of four N×12 boolean matrices. Same rules as
+    season_lengths(): the masks' bit counts are the four lengths (where the
+    thresholds overlap a month is in both the winter and summer masks, as it
+    is counted in both lengths). The flat-month split is a FLAT_SPRING lookup.
+    """
+    T_c = np.asarray(T_c, dtype=float)
+    is_winter = T_c <= winter_c
+    is_summer = T_c >= summer_c
+    is_transition = ~is_winter & ~is_summer
+    delta = np.roll(T_c, -1, axis=1) - T_c  # next_month - this_month
+
+    flat = pack_months(is_transition & (delta == 0))
+    flat_spring = FLAT_SPRING[flat]
+    spring = pack_months(is_transition & (delta > 0)) | flat_spring
+    fall = pack_months(is_transition & (delta < 0)) | (flat & ~flat_spring)
+    return pack_months(is_winter), spring, pack_months(is_summer), fall
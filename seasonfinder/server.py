@@ -0,0 +1,249 @@
+"""Local JSON scoring service.
+
+    python -m seasonfinder serve cities.csv --port 8765
+    curl 'localhost:8765/rank?winter_thresh=5&summer_thresh=20&w=5&sp=2&su=3&fa=2&k=10'
+
+The dataset and its SeasonIndex are built once at startup; per threshold pair
+the CompositionIndex is cached (byte-budgeted LRU). Request threads hand their
+query to a single scoring thread, which drains everything that queued up
+while it was busy and answers it as one batch, grouped by threshold pair, so
+throughput grows with load instead of each request paying for its own pass.
+
+Endpoints: /rank, /stats (request count, p50/p99 latency, batching, cache),
+/health. Connections are HTTP/1.1 keep-alive.
+"""
+
+import json
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from .cache import ByteLRU
+from .scoring import MAX_SCORE, CompositionIndex
+from .seasons import SeasonIndex
+
+SEASONS = ["Winter", "Spring", "Summer", "Autumn"]
+MAX_K = 1000
+
+
+class Engine:
+    """Dataset + indexes shared by all requests (read-only after startup)."""
+
+    def __init__(self, labels, T, cache_bytes=64 << 20):
+        self.n = len(T)
+        self.cities = labels.get("City", [""] * self.n)
+        self.countries = labels.get("Country", [""] * self.n)
+        self.index = SeasonIndex(T)
+        self.buckets = ByteLRU(cache_bytes)
+
+    def buckets_for(self, winter_c, summer_c):
+        return self.buckets.get_or_create(
+            (winter_c, summer_c),
+            lambda: CompositionIndex(*self.index.lengths(winter_c, summer_c)),
+            lambda b: b.nbytes,
+        )
+
+    def rank_many(self, winter_c, summer_c, profiles, k):
+        """(rows, dist, buckets) for an M×4 profile matrix under one threshold pair."""
+        buckets = self.buckets_for(winter_c, summer_c)
+        rows, dist = buckets.top_k_batch(profiles, k)
+        return rows, dist, buckets
+
+    def records(self, rows, dist, buckets):
+        out = []
+        for rank, (row, d) in enumerate(zip(rows, dist), start=1):
+            if row < 0:
+                break
+            score = MAX_SCORE - int(d)
+            lengths = buckets.lengths[buckets.bucket[row]]
+            rec = {
+                "rank": rank,
+                "row": int(row),
+                "city": self.cities[row],
+                "country": self.countries[row],
+                "score": score,
+                "match": round(score / MAX_SCORE * 100, 1),
+            }
+            rec.update({name.lower(): int(v) for name, v in zip(SEASONS, lengths)})
+            out.append(rec)
+        return out
+
+
+class Batcher:
+    """Single scoring thread that answers queued requests in batches."""
+
+    def __init__(self, engine, max_batch=512):
+        self.engine = engine
+        self.max_batch = max_batch
+        self.queue = queue.Queue()
+        self.batches = 0
+        self.batched = 0
+        self.largest = 0
+        self._thread = threading.Thread(target=self._run, name="seasonfinder-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, winter_c, summer_c, prefs, k):
+        fut = Future()
+        self.queue.put((winter_c, summer_c, prefs, k, fut))
+        return fut
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            # No artificial wait: whatever piled up while we were busy joins in
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            self.batches += 1
+            self.batched += len(batch)
+            self.largest = max(self.largest, len(batch))
+
+            groups = {}
+            for item in batch:
+                groups.setdefault((item[0], item[1]), []).append(item)
+            for (winter_c, summer_c), items in groups.items():
+                try:
+                    profiles = np.array([it[2] for it in items], dtype=np.int16)
+                    k = max(it[3] for it in items)
+                    rows, dist, buckets = self.engine.rank_many(winter_c, summer_c, profiles, k)
+                    for i, it in enumerate(items):
+                        kk = it[3]
+                        it[4].set_result(self.engine.records(rows[i, :kk], dist[i, :kk], buckets))
+                except Exception as e:  # don't let one bad group kill the thread
+                    for it in items:
+                        if not it[4].done():
+                            it[4].set_exception(e)
+
+
+class Latency:
+    def __init__(self, keep=10_000):
+        self.samples = deque(maxlen=keep)
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        with self._lock:
+            self.samples.append(seconds)
+            self.count += 1
+
+    def summary(self):
+        with self._lock:
+            s = np.array(self.samples)
+        if not len(s):
+            return {"requests": self.count, "p50_ms": None, "p99_ms": None}
+        p50, p99 = np.percentile(s, [50, 99]) * 1e3
+        return {"requests": self.count, "p50_ms": round(p50, 3), "p99_ms": round(p99, 3)}
+
+
+def parse_rank_query(qs):
+    """Validate /rank parameters; raises ValueError with a user-facing message."""
+
+    def num(name, default, cast=float):
+        vals = qs.get(name)
+        if not vals:
+            if default is None:
+                raise ValueError(f"missing parameter: {name}")
+            return default
+        try:
+            return cast(vals[0])
+        except ValueError:
+            raise ValueError(f"bad value for {name}: {vals[0]!r}") from None
+
+    winter = num("winter_thresh", 5.0)
+    summer = num("summer_thresh", 20.0)
+    if not np.isfinite([winter, summer]).all():  # float() takes "nan" and "inf"
+        raise ValueError("winter_thresh and summer_thresh must be finite numbers")
+    if qs.get("unit", ["C"])[0].upper().lstrip("°") == "F":
+        winter, summer = (winter - 32) * 5 / 9, (summer - 32) * 5 / 9
+    if winter >= summer:
+        raise ValueError("winter_thresh must be below summer_thresh")
+    prefs = [num("w", 5, int), num("sp", 2, int), num("su", 3, int)]
+    prefs.append(num("fa", 12 - sum(prefs), int))
+    if min(prefs) < 0 or sum(prefs) != 12:
+        raise ValueError("w, sp, su, fa must be non-negative and sum to 12")
+    k = num("k", 20, int)
+    if not 1 <= k <= MAX_K:
+        raise ValueError(f"k must be between 1 and {MAX_K}")
+    return winter, summer, prefs, k
+
+
+def make_handler(engine, batcher, latency):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+        # Headers and body go out in separate writes; with Nagle on, keep-alive
+        # clients wait ~40 ms on delayed ACKs for every response
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):  # quiet; /stats has the numbers
+            pass
+
+        def send_json(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            start = time.perf_counter()
+            url = urlparse(self.path)
+            if url.path == "/rank":
+                try:
+                    winter, summer, prefs, k = parse_rank_query(parse_qs(url.query))
+                except ValueError as e:
+                    self.send_json(400, {"error": str(e)})
+                    return
+                results = batcher.submit(winter, summer, prefs, k).result()
+                self.send_json(200, {
+                    "winter_thresh_c": winter,
+                    "summer_thresh_c": summer,
+                    "prefs": dict(zip([s.lower() for s in SEASONS], prefs)),
+                    "results": results,
+                })
+                latency.add(time.perf_counter() - start)
+            elif url.path == "/stats":
+                stats = latency.summary()
+                stats["batches"] = batcher.batches
+                stats["mean_batch"] = round(batcher.batched / batcher.batches, 2) if batcher.batches else None
+                stats["largest_batch"] = batcher.largest
+                stats["cities"] = engine.n
+                stats["cache"] = engine.buckets.stats()
+                self.send_json(200, stats)
+            elif url.path == "/health":
+                self.send_json(200, {"ok": True})
+            else:
+                self.send_json(404, {"error": "not found"})
+
+    return Handler
+
+
+def make_server(labels, T, host="127.0.0.1", port=8765):
+    engine = Engine(labels, T)
+    batcher = Batcher(engine)
+    latency = Latency()
+    server = ThreadingHTTPServer((host, port), make_handler(engine, batcher, latency))
+    server.daemon_threads = True
+    return server
+
+
+def serve(path, host="127.0.0.1", port=8765):
+    from .data import read_temps_csv
+
+    labels, T = read_temps_csv(path)
+    server = make_server(labels, T, host, port)
+    print(f"serving {len(T)} cities on http://{host}:{server.server_address[1]}/rank")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,106 @@
+"""Threshold sensitivity: the ranking over a whole grid of (winter, summer) pairs.
+
+"Would my top city still win at 4°C instead of 5°C?" Every season length is
+a difference of SeasonIndex counts, and each count depends on one threshold
+only: winter-side counts on the winter threshold, summer-side counts on the
+summer threshold. So a W×S grid needs W + S passes over the sorted months,
+not W×S classifications. Each cell then combines two precomputed rows, takes
+the distance, and keeps only the winner and the rank of one focus city.
+
+    sweep = threshold_sweep(ds.season_index, np.arange(2, 8.5, 0.5),
+                            np.arange(17, 23.5, 0.5), prefs, focus=top_row)
+    sweep.top_rows      # W×S best row per cell (ties: lower row)
+    sweep.focus_ranks   # W×S rank of the focus row per cell
+
+Cells with winter >= summer are settings the app rejects; they are skipped
+(top row -1, rank 0) and left out of stability().
+
+Monthly data only; plain distance (no contiguity penalty).
+"""
+
+import numpy as np
+
+from .scoring import MAX_SCORE
+
+
+class Sweep:
+    def __init__(self, winter, summer, top_rows, top_dist, focus, focus_ranks):
+        self.winter = winter
+        self.summer = summer
+        self.top_rows = top_rows
+        self.top_dist = top_dist
+        self.focus = focus
+        self.focus_ranks = focus_ranks
+
+    @property
+    def shape(self):
+        return self.top_rows.shape
+
+    @property
+    def valid(self):
+        """W×S bool: cells with winter below summer, the only ones ranked."""
+        return np.asarray(self.winter)[:, None] < np.asarray(self.summer)[None, :]
+
+    def stability(self):
+        """Share of the valid cells whose winner is the focus row (0..1)."""
+        valid = self.valid
+        if self.focus is None or not valid.any():
+            return None
+        return float(np.mean(self.top_rows[valid] == self.focus))
+
+    def top_scores(self):
+        return MAX_SCORE - self.top_dist
+
+
+def combine_distance(low, high, valid, prefs):
+    """Distance from threshold counts: `low` at the winter threshold, `high`
+    (strict) at the summer one, as from SeasonIndex.threshold_counts().
+
+    Leading axis is (all, warming, cooling, flat); the rest broadcast.
+    """
+    p_w, p_sp, p_su, p_fa = (int(p) for p in prefs)
+    low = low.astype(np.int16)
+    between = high[1:].astype(np.int16) - low[1:]
+    np.maximum(between, 0, out=between)
+    warming, cooling, flat = between
+    half = flat // 2
+    return (
+        np.abs(low[0] - p_w)
+        + np.abs(valid - high[0] - p_su)
+        + np.abs(warming + half - p_sp)
+        + np.abs(cooling + (flat - half) - p_fa)
+    )
+
+
+def threshold_sweep(index, winter_grid, summer_grid, prefs, focus=None):
+    """Winner (and the focus row's rank) for every (winter, summer) cell.
+
+    `index` is the dataset's SeasonIndex. Rows of the result follow
+    `winter_grid`, columns `summer_grid`.
+    """
+    winter_grid = np.asarray(winter_grid, dtype=float)
+    summer_grid = np.asarray(summer_grid, dtype=float)
+    shape = (len(winter_grid), len(summer_grid))
+    top_rows = np.full(shape, -1, dtype=np.int64)
+    top_dist = np.zeros(shape, dtype=np.int16)
+    focus_ranks = None if focus is None else np.zeros(shape, dtype=np.int64)
+    if len(index) == 0:
+        return Sweep(winter_grid, summer_grid, top_rows, top_dist, focus, focus_ranks)
+
+    # The only threshold-dependent work: one pass per grid value, per side
+    low = [index.threshold_counts(w) for w in winter_grid]
+    high = [index.threshold_counts(s, strict=True) for s in summer_grid]
+    valid = index.valid_len.astype(np.int16)
+
+    for i, lo in enumerate(low):
+        for j, hi in enumerate(high):
+            if winter_grid[i] >= summer_grid[j]:
+                continue  # overlapping thresholds: not a setting
+            dist = combine_distance(lo, hi, valid, prefs)
+            best = int(np.argmin(dist))  # first minimum: ties go to the lower row
+            top_rows[i, j] = best
+            top_dist[i, j] = dist[best]
+            if focus is not None:
+                d = dist[focus]
+                focus_ranks[i, j] = 1 + np.count_nonzero(dist < d) + np.count_nonzero(dist[:focus] == d)
+    return Sweep(winter_grid, summer_grid, top_rows, top_dist, focus, focus_ranks)